@@ -0,0 +1,229 @@
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import shared_path
+from audio_buffer import AudioBuffer
+from audio_cache import AudioCache
+from inference_pool import InferencePool, PooledEngine
+from model_index import ModelIndex, load_model
+from settings_manager import SettingsManager
+from synthesis_engine import create_engine
+from tracing import DEFAULT_TRACE_FILE, enable_profiling
+
+STATE_FILE = '.batch_state.json'
+
+class BatchJob:
+    def __init__(self, input_path, output_path, settings=None):
+        self.input_path = input_path
+        self.output_path = output_path
+        # Model and synthesis parameters; changing any of them re-renders the file
+        self.settings = settings or {}
+
+    def fingerprint(self):
+        stat = os.stat(self.input_path)
+        settings = json.dumps(self.settings, sort_keys=True)
+        return hashlib.sha256(f"{self.input_path}:{stat.st_size}:{stat.st_mtime}:{settings}".encode('utf-8')).hexdigest()
+
+def collect_jobs(source, output_dir, audio_format, settings=None):
+    jobs = []
+    if os.path.isdir(source):
+        for directory, subdirs, files in os.walk(source):
+            subdirs.sort()
+            for name in sorted(files):
+                if name.endswith('.txt'):
+                    input_path = os.path.join(directory, name)
+                    relative = os.path.splitext(os.path.relpath(input_path, source))[0]
+                    jobs.append(BatchJob(input_path, os.path.join(output_dir, f"{relative}.{audio_format}"),
+                                         settings))
+        return jobs
+
+    # Manifest: one text file per line, optionally followed by a tab and the output file
+    base_dir = os.path.dirname(os.path.abspath(source))
+    with open(source, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            parts = line.split('\t')
+            input_path = os.path.join(base_dir, parts[0])
+            if len(parts) > 1:
+                output_path = os.path.join(output_dir, parts[1])
+            else:
+                name = os.path.splitext(os.path.basename(parts[0]))[0]
+                output_path = os.path.join(output_dir, f"{name}.{audio_format}")
+            jobs.append(BatchJob(input_path, output_path, settings))
+    return jobs
+
+class BatchState:
+    def __init__(self, output_dir):
+        self.path = os.path.join(output_dir, STATE_FILE)
+        self.lock = threading.Lock()
+        self.completed = {}
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as f:
+                self.completed = json.load(f)
+
+    def is_done(self, job):
+        return (self.completed.get(job.output_path) == job.fingerprint()
+                and os.path.exists(job.output_path))
+
+    def mark_done(self, job):
+        with self.lock:
+            self.completed[job.output_path] = job.fingerprint()
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'w') as f:
+                json.dump(self.completed, f, indent=1)
+            os.replace(temp_path, self.path)
+
+# Renders files through a SynthesisEngine, so the sentence cache and exact
+# speech rate apply as in the apps
+class BatchConverter:
+    def __init__(self, engine, workers=2, words_per_minute=0, serialize=True):
+        self.engine = engine
+        self.workers = max(1, workers)
+        self.words_per_minute = words_per_minute
+        # With serialize one model instance is shared, so inference runs one
+        # file at a time while reading, splitting, encoding and writing run in
+        # parallel around it; an inference pool takes every worker's requests
+        self.inference_lock = threading.Lock() if serialize else contextlib.nullcontext()
+        self.stats_lock = threading.Lock()
+        self.chars = 0
+        self.audio_seconds = 0.0
+        self.inference_seconds = 0.0
+
+    def render(self, text):
+        with self.inference_lock:
+            started_at = time.perf_counter()
+            buffers = self.engine.render(self.engine.split(text), self.words_per_minute)
+            elapsed = time.perf_counter() - started_at
+        with self.stats_lock:
+            self.inference_seconds += elapsed
+        return buffers
+
+    def convert(self, job):
+        with open(job.input_path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        audio = AudioBuffer.concatenate(self.render(text))
+        os.makedirs(os.path.dirname(job.output_path) or '.', exist_ok=True)
+        extension = os.path.splitext(job.output_path)[1]
+        temp_path = f"{job.output_path}.partial{extension}"
+        audio.save(temp_path)
+        os.replace(temp_path, job.output_path)
+        with self.stats_lock:
+            self.chars += len(text)
+            self.audio_seconds += audio.duration
+        return audio.duration
+
+    def run(self, jobs, state=None):
+        done, skipped, failed = 0, 0, 0
+        pending = []
+        for job in jobs:
+            if state and state.is_done(job):
+                skipped += 1
+            else:
+                pending.append(job)
+
+        started_at = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self.convert, job): job for job in pending}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    duration = future.result()
+                    if state:
+                        state.mark_done(job)
+                    done += 1
+                    print(f"[{done + failed}/{len(pending)}] {job.output_path} ({duration:.1f}s of audio)")
+                except Exception as e:
+                    failed += 1
+                    print(f"[{done + failed}/{len(pending)}] FAILED {job.input_path}: {str(e)}", file=sys.stderr)
+        wall_seconds = time.perf_counter() - started_at
+        return {
+            'files_converted': done,
+            'files_skipped': skipped,
+            'files_failed': failed,
+            'characters': self.chars,
+            'audio_seconds': round(self.audio_seconds, 2),
+            'wall_seconds': round(wall_seconds, 2),
+            'chars_per_second': round(self.chars / wall_seconds, 1) if wall_seconds else 0.0,
+            # Processing time per second of audio; below 1.0 is faster than real time
+            'real_time_factor': round(wall_seconds / self.audio_seconds, 3) if self.audio_seconds else 0.0,
+            'inference_seconds': round(self.inference_seconds, 2),
+        }
+
+def print_summary(summary):
+    print()
+    print(f"Converted {summary['files_converted']} file(s), skipped {summary['files_skipped']} "
+          f"already done, {summary['files_failed']} failed")
+    print(f"{summary['characters']} characters -> {summary['audio_seconds']:.1f}s of audio "
+          f"in {summary['wall_seconds']:.1f}s")
+    print(f"Throughput: {summary['chars_per_second']} chars/sec, "
+          f"real-time factor {summary['real_time_factor']}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render text files to audio with an offline TTS model.")
+    parser.add_argument('source', help="Directory of .txt files, or a manifest listing one text file per line")
+    parser.add_argument('-o', '--output-dir', required=True, help="Where to write the audio files")
+    parser.add_argument('-m', '--model', required=True, help="TTS model name, e.g. tts_models/en/ljspeech/vits")
+    parser.add_argument('-f', '--format', default='wav', help="Audio format for outputs without an explicit name")
+    parser.add_argument('-w', '--workers', type=int, default=2, help="Files processed concurrently")
+    parser.add_argument('-p', '--processes', type=int, default=0,
+                        help="Spread sentences over this many inference processes (0 = one in-process model)")
+    parser.add_argument('-b', '--batch-size', type=int, default=8,
+                        help="Sentences of similar length synthesized in one forward pass")
+    parser.add_argument('--words-per-minute', type=int, default=0,
+                        help="Speech rate, applied by time-stretching (default: the voice's natural pace)")
+    parser.add_argument('--no-cache', action='store_true', help="Don't use the sentence audio cache")
+    parser.add_argument('--no-resume', action='store_true', help="Re-render files finished by an earlier run")
+    parser.add_argument('--summary-json', help="Also write the throughput summary to this file")
+    parser.add_argument('--profile', nargs='?', const=DEFAULT_TRACE_FILE, metavar='TRACE_FILE',
+                        help="Record per-stage timings and write a Chrome trace (default: %(const)s)")
+    args = parser.parse_args(argv)
+    if args.profile:
+        enable_profiling(args.profile)
+
+    jobs = collect_jobs(args.source, args.output_dir, args.format,
+                        {'model': args.model, 'batch_size': args.batch_size,
+                         'words_per_minute': args.words_per_minute})
+    if not jobs:
+        print("No text files found.", file=sys.stderr)
+        return 1
+    os.makedirs(args.output_dir, exist_ok=True)
+    state = None if args.no_resume else BatchState(args.output_dir)
+
+    settings_manager = SettingsManager()
+    audio_cache = None
+    if not args.no_cache:
+        audio_cache = AudioCache(settings_manager.get_audio_cache_dir(), settings_manager.get_audio_cache_size())
+    load_started_at = time.perf_counter()
+    if args.processes:
+        pool = InferencePool(args.model, settings_manager.get_model_paths(), args.processes)
+        engine = PooledEngine(pool, cache=audio_cache, batch_size=args.batch_size)
+        converter = BatchConverter(engine, max(args.workers, args.processes), args.words_per_minute,
+                                   serialize=False)
+    else:
+        model_index = ModelIndex(settings_manager.get_model_paths())
+        model_index.scan()
+        engine = create_engine('coqui', model_name=args.model, tts=load_model(args.model, model_index),
+                               cache=audio_cache, batch_size=args.batch_size)
+        converter = BatchConverter(engine, args.workers, args.words_per_minute)
+    print(f"Loaded {args.model} in {time.perf_counter() - load_started_at:.1f}s")
+
+    try:
+        summary = converter.run(jobs, state)
+    finally:
+        engine.close()
+    print_summary(summary)
+    if args.summary_json:
+        with open(args.summary_json, 'w') as f:
+            json.dump(summary, f, indent=2)
+    return 1 if summary['files_failed'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,241 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import time
+import shared_path
+from incremental import IncrementalRenderer
+from sentence_splitter import split_sentences
+from synthesis_engine import available_engines, create_engine
+from tracing import DEFAULT_TRACE_FILE, enable_profiling
+
+_PARAGRAPH = ("The lighthouse keeper climbed the spiral stairs one last time before the storm. "
+              "Below him the harbour lights flickered, and the fishing boats pulled at their ropes. "
+              "He had kept the lamp burning for thirty years, through fog and gale and one long winter "
+              "when the supply ship never came. Tonight, he thought, would be no different. "
+              "Still, he checked the oil twice, wiped the great lens clean, and wound the clockwork "
+              "that turned it. Then he sat down by the window to wait.")
+
+# Fixed texts so results are comparable between runs and machines
+CORPUS = {
+    'short': "Hello there. This is a short test.",
+    'medium': _PARAGRAPH,
+    'long': ' '.join([_PARAGRAPH] * 8),
+}
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+# Plays the text the way the app does: the first segment on its own so audio
+# can start, then the rest in batches. Engines that deliver compressed audio
+# are timed on that stream, so decoding isn't counted against the service.
+def run_engine(engine, text):
+    capabilities = engine.capabilities()
+    started_at = time.perf_counter()
+    first_audio = None
+    audio_seconds = 0.0
+    if capabilities.encoded_bitrate:
+        for data in engine.stream_encoded(text):
+            first_audio = first_audio or time.perf_counter() - started_at
+            # Constant bitrate, so size gives duration without decoding
+            audio_seconds += len(data) * 8 / capabilities.encoded_bitrate
+    else:
+        for buffer in engine.stream(text):
+            first_audio = first_audio or time.perf_counter() - started_at
+            audio_seconds += buffer.duration
+    return first_audio, time.perf_counter() - started_at, audio_seconds
+
+# Edits of growing size to one text, each re-rendered from the original: the
+# time should follow the number of changed sentences, not the text's length
+EDIT_FRACTIONS = {'one_sentence': 0, 'ten_percent': 0.1, 'half': 0.5}
+
+def edit_sentences(sentences, fraction):
+    count = max(1, round(len(sentences) * fraction))
+    step = len(sentences) / count
+    edited = list(sentences)
+    for index in range(count):
+        position = int(index * step)
+        edited[position] = edited[position].rstrip('.!?') + f", edit {index + 1}."
+    return ' '.join(edited), count
+
+def run_edits(engine, text):
+    renderer = IncrementalRenderer(engine, encoded=bool(engine.capabilities().encoded_bitrate))
+    renderer.render(text)
+    results = {'full': dict(renderer.last_stats)}
+    sentences = split_sentences(text, engine.max_segment_chars)
+    for name, fraction in EDIT_FRACTIONS.items():
+        edited, count = edit_sentences(sentences, fraction)
+        renderer.render(edited)
+        results[name] = dict(renderer.last_stats, edited_sentences=count)
+        # Back to the original, untimed, so every edit starts from the same state
+        renderer.render(text)
+    for result in results.values():
+        result['seconds'] = round(result['seconds'], 4)
+    return results
+
+def load_engine(engine_name, model_name, batch_size, model_paths):
+    if engine_name == 'coqui':
+        from model_index import ModelIndex, load_model
+        model_index = ModelIndex(model_paths)
+        model_index.scan()
+        return create_engine('coqui', model_name=model_name, tts=load_model(model_name, model_index),
+                             batch_size=batch_size)
+    if engine_name == 'gtts':
+        # No disk cache, so every run measures the service
+        from chunked_tts import ChunkedSynthesizer
+        return create_engine('gtts', lang=model_name, synthesizer=ChunkedSynthesizer())
+    return create_engine(engine_name, batch_size=batch_size)
+
+def summarize(text, runs):
+    first_audio = statistics.median(run[0] for run in runs)
+    seconds = statistics.median(run[1] for run in runs)
+    audio_seconds = runs[0][2]
+    return {
+        'characters': len(text),
+        'runs': len(runs),
+        'time_to_first_audio': round(first_audio, 4),
+        'seconds': round(seconds, 4),
+        'seconds_min': round(min(run[1] for run in runs), 4),
+        'seconds_max': round(max(run[1] for run in runs), 4),
+        'audio_seconds': round(audio_seconds, 3),
+        'real_time_factor': round(seconds / audio_seconds, 4) if audio_seconds else None,
+        'chars_per_second': round(len(text) / seconds, 1) if seconds else None,
+    }
+
+def benchmark_model(engine, model_name, texts, repeats=3, batch_size=8, model_paths=(), incremental=False):
+    started_at = time.perf_counter()
+    target = load_engine(engine, model_name, batch_size, model_paths)
+    load_seconds = time.perf_counter() - started_at
+    rss_after_load = peak_rss_mb()
+    # One untimed pass so lazy initialisation isn't counted against the first text
+    run_engine(target, CORPUS['short'])
+    results = {}
+    for name, text in texts.items():
+        results[name] = summarize(text, [run_engine(target, text) for _ in range(repeats)])
+    edits = run_edits(target, max(texts.values(), key=len)) if incremental else None
+    # Shows whether the keep-alive session really reused its connections
+    connections = target.synthesizer.client.stats() if engine == 'gtts' else None
+    target.close()
+    return {
+        'capabilities': target.capabilities().to_dict(),
+        'engine': engine,
+        'model': model_name,
+        'load_seconds': round(load_seconds, 3),
+        'peak_rss_mb_after_load': rss_after_load,
+        'peak_rss_mb': peak_rss_mb(),
+        'texts': results,
+        'incremental': edits,
+        'connections': connections,
+    }
+
+# Each model runs in a fresh process so its load time is a cold load and its
+# peak RSS isn't inflated by the models measured before it
+def benchmark_isolated(*args):
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1) as pool:
+        return pool.apply(benchmark_model, args)
+
+def load_corpus(corpus_dir=None):
+    if not corpus_dir:
+        return dict(CORPUS)
+    texts = {}
+    for file_name in sorted(os.listdir(corpus_dir)):
+        if file_name.endswith('.txt'):
+            with open(os.path.join(corpus_dir, file_name), 'r', encoding='utf-8') as f:
+                texts[file_name[:-4]] = f.read()
+    return texts
+
+def print_report(report, baseline=None):
+    previous = {}
+    for result in (baseline or {}).get('results', []):
+        for name, text_result in result['texts'].items():
+            previous[(result['engine'], result['model'], name)] = text_result
+    print(f"{'model':<40} {'text':<8} {'first audio':>11} {'seconds':>9} {'RTF':>7} {'chars/sec':>10}  change")
+    for result in report['results']:
+        print(f"{result['engine']}:{result['model']}  loaded in {result['load_seconds']:.2f}s, "
+              f"peak RSS {result['peak_rss_mb']} MB")
+        for name, text_result in result['texts'].items():
+            change = ''
+            before = previous.get((result['engine'], result['model'], name))
+            if before and before['seconds']:
+                change = f"{100 * (text_result['seconds'] / before['seconds'] - 1):+.1f}%"
+            print(f"{'':<40} {name:<8} {text_result['time_to_first_audio']:>10.3f}s {text_result['seconds']:>8.3f}s "
+                  f"{text_result['real_time_factor'] or 0:>7.3f} {text_result['chars_per_second'] or 0:>10.1f}  {change}")
+        connections = result.get('connections')
+        if connections:
+            latency = connections['latency']
+            print(f"{'':<40} {connections['requests']} requests ({connections['failures']} failed) over "
+                  f"{connections['connections_opened']} connections, {connections['connections_reused']} reused; "
+                  f"latency p50 {latency.get('p50_ms', 0)} ms, p95 {latency.get('p95_ms', 0)} ms")
+        for name, edit in (result.get('incremental') or {}).items():
+            print(f"{'':<40} re-render {name:<13} {edit['rendered']:>4} of {edit['segments']} segments "
+                  f"{edit['seconds']:>8.3f}s")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark synthesis latency, throughput and real-time factor.")
+    parser.add_argument('-e', '--engine', choices=available_engines(), default='stub',
+                        help="stub needs no weights or network (default: stub)")
+    parser.add_argument('-m', '--model', action='append', default=[],
+                        help="Model (coqui) or language (gtts) to benchmark; repeatable")
+    parser.add_argument('-r', '--repeats', type=int, default=3, help="Timed runs per text (the median is reported)")
+    parser.add_argument('-b', '--batch-size', type=int, default=8, help="Sentences per forward pass")
+    parser.add_argument('--corpus', help="Directory of .txt files to use instead of the built-in corpus")
+    parser.add_argument('-o', '--output', default='benchmark_results.json', help="Where to write the JSON results")
+    parser.add_argument('--compare', help="Previous results JSON to compare against")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Also time re-rendering the longest text after edits of growing size")
+    parser.add_argument('--in-process', action='store_true',
+                        help="Run every model in this process (peak RSS then covers all of them)")
+    parser.add_argument('--profile', nargs='?', const=DEFAULT_TRACE_FILE, metavar='TRACE_FILE',
+                        help="Record per-stage timings and write a Chrome trace (implies --in-process)")
+    args = parser.parse_args(argv)
+    if args.profile:
+        enable_profiling(args.profile)
+        args.in_process = True
+
+    model_paths = []
+    if args.engine == 'coqui':
+        if not args.model:
+            parser.error("--model is required with --engine coqui")
+        from settings_manager import SettingsManager
+        model_paths = SettingsManager().get_model_paths()
+    models = args.model or ['en' if args.engine == 'gtts' else args.engine]
+    texts = load_corpus(args.corpus)
+    benchmark = benchmark_model if args.in_process else benchmark_isolated
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'host': {
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'cpu_count': os.cpu_count(),
+        },
+        'settings': {'repeats': args.repeats, 'batch_size': args.batch_size, 'incremental': args.incremental},
+        'results': [],
+    }
+    for model_name in models:
+        print(f"Benchmarking {args.engine}:{model_name}...")
+        report['results'].append(benchmark(args.engine, model_name, texts, args.repeats, args.batch_size,
+                                           model_paths, args.incremental))
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=4)
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    print(f"Results saved to {args.output}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
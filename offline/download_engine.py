@@ -0,0 +1,245 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+
+# Token bucket shared by all running downloads to cap total bandwidth
+class RateLimiter:
+    def __init__(self, bytes_per_second=0):
+        self.bytes_per_second = bytes_per_second
+        self.tokens = bytes_per_second
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def set_rate(self, bytes_per_second):
+        with self.lock:
+            self.bytes_per_second = bytes_per_second
+            self.tokens = min(self.tokens, bytes_per_second)
+
+    def consume(self, size):
+        with self.lock:
+            if self.bytes_per_second <= 0:
+                return
+            now = time.monotonic()
+            self.tokens = min(self.bytes_per_second,
+                              self.tokens + (now - self.updated_at) * self.bytes_per_second)
+            self.updated_at = now
+            self.tokens -= size
+            delay = -self.tokens / self.bytes_per_second if self.tokens < 0 else 0
+        if delay:
+            time.sleep(delay)
+
+class DownloadCanceled(Exception):
+    pass
+
+class DownloadError(Exception):
+    pass
+
+# Downloads one URL to dest_path. When the server supports range requests the
+# file is fetched as several segments in parallel, and the byte ranges already
+# on disk are recorded next to the .part file so an interrupted download
+# resumes where it left off instead of starting over.
+class DownloadEngine:
+    def __init__(self, url, dest_path, connections=4, expected_hash=None, hash_algorithm='sha256',
+                 progress_callback=None, block_size=64 * 1024, retries=3, timeout=30, rate_limiter=None):
+        self.url = url
+        self.dest_path = dest_path
+        self.part_path = dest_path + '.part'
+        self.state_path = dest_path + '.part.json'
+        self.connections = max(1, connections)
+        self.expected_hash = expected_hash
+        self.hash_algorithm = hash_algorithm
+        self.progress_callback = progress_callback
+        self.block_size = block_size
+        self.retries = retries
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.total_size = None
+        self.downloaded = 0
+        self.segments = []
+        self.lock = threading.Lock()
+        self.state_lock = threading.Lock()
+        self._running = threading.Event()
+        self._running.set()
+        self._canceled = threading.Event()
+        self._last_state_save = 0
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def cancel(self):
+        self._canceled.set()
+        self._running.set()
+
+    def is_paused(self):
+        return not self._running.is_set()
+
+    def run(self):
+        self.total_size, accepts_ranges = self._probe()
+        if self.total_size is not None and accepts_ranges:
+            self._load_or_create_segments()
+        else:
+            # No size or no range support: a single stream that restarts from zero
+            self.segments = [[0, self.total_size, 0]]
+            if os.path.exists(self.part_path):
+                os.remove(self.part_path)
+        self.downloaded = sum(segment[2] for segment in self.segments)
+        self._report()
+
+        if not os.path.exists(self.part_path):
+            with open(self.part_path, 'wb') as f:
+                if self.total_size:
+                    f.truncate(self.total_size)
+
+        errors = []
+        threads = []
+        for index, segment in enumerate(self.segments):
+            if segment[1] is not None and segment[2] >= segment[1] - segment[0]:
+                continue
+            thread = threading.Thread(target=self._run_segment, args=(index, accepts_ranges, errors), daemon=True)
+            threads.append(thread)
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self._save_state()
+        if errors:
+            raise DownloadError(str(errors[0]))
+        if self._canceled.is_set():
+            raise DownloadCanceled("Download canceled")
+        if self.total_size is not None and self.downloaded != self.total_size:
+            raise DownloadError(f"Incomplete download: got {self.downloaded} of {self.total_size} bytes")
+        self._verify()
+        os.replace(self.part_path, self.dest_path)
+        if os.path.exists(self.state_path):
+            os.remove(self.state_path)
+        return self.dest_path
+
+    def _request(self, headers=None, method='GET'):
+        request = urllib.request.Request(self.url, headers=headers or {}, method=method)
+        return urllib.request.urlopen(request, timeout=self.timeout)
+
+    def _probe(self):
+        try:
+            with self._request({'Range': 'bytes=0-0'}) as response:
+                if response.status == 206:
+                    content_range = response.headers.get('Content-Range', '')
+                    total = content_range.rsplit('/', 1)[-1]
+                    return (int(total), True) if total.isdigit() else (None, False)
+                length = response.headers.get('Content-Length')
+                return (int(length) if length else None), False
+        except urllib.error.HTTPError as e:
+            raise DownloadError(f"HTTP {e.code} for {self.url}")
+        except (urllib.error.URLError, OSError) as e:
+            raise DownloadError(str(e))
+
+    def _load_or_create_segments(self):
+        if os.path.exists(self.state_path) and os.path.exists(self.part_path):
+            try:
+                with open(self.state_path, 'r') as f:
+                    state = json.load(f)
+                if state.get('url') == self.url and state.get('total_size') == self.total_size:
+                    self.segments = state['segments']
+                    return
+            except (OSError, ValueError, KeyError):
+                pass
+        if os.path.exists(self.part_path):
+            os.remove(self.part_path)
+        segment_size = -(-self.total_size // self.connections)
+        self.segments = []
+        for start in range(0, self.total_size, segment_size):
+            self.segments.append([start, min(start + segment_size, self.total_size), 0])
+        if not self.segments:
+            self.segments = [[0, 0, 0]]
+
+    def _save_state(self, force=True):
+        if self.total_size is None:
+            return
+        with self.state_lock:
+            now = time.monotonic()
+            if not force and now - self._last_state_save < 1:
+                return
+            self._last_state_save = now
+            with self.lock:
+                state = {'url': self.url, 'total_size': self.total_size,
+                         'segments': [list(segment) for segment in self.segments]}
+            with open(self.state_path, 'w') as f:
+                json.dump(state, f)
+
+    def _run_segment(self, index, accepts_ranges, errors):
+        attempt = 0
+        while not self._canceled.is_set():
+            self._running.wait()
+            if self._canceled.is_set():
+                return
+            try:
+                if self._fetch_segment(index, accepts_ranges):
+                    return
+                attempt = 0
+            except (urllib.error.URLError, OSError, DownloadError) as e:
+                attempt += 1
+                if attempt > self.retries:
+                    errors.append(e)
+                    self.cancel()
+                    return
+                time.sleep(min(2 ** attempt, 10))
+
+    # Returns True once the segment is complete, False when interrupted by pause
+    def _fetch_segment(self, index, accepts_ranges):
+        start, end, done = self.segments[index]
+        headers = {}
+        if accepts_ranges:
+            headers['Range'] = f'bytes={start + done}-{end - 1}'
+        elif done:
+            # Without range support a retry starts the whole file again
+            with self.lock:
+                self.downloaded -= done
+                self.segments[index][2] = done = 0
+        with self._request(headers) as response, open(self.part_path, 'r+b') as f:
+            if accepts_ranges and response.status != 206:
+                raise DownloadError("Server ignored the range request")
+            f.seek(start + done)
+            while True:
+                if self._canceled.is_set() or not self._running.is_set():
+                    return False
+                to_read = self.block_size
+                if end is not None:
+                    to_read = min(to_read, end - start - self.segments[index][2])
+                    if to_read <= 0:
+                        return True
+                block = response.read(to_read)
+                if not block:
+                    if end is not None and self.segments[index][2] < end - start:
+                        raise DownloadError("Connection closed early")
+                    return True
+                if self.rate_limiter:
+                    self.rate_limiter.consume(len(block))
+                f.write(block)
+                with self.lock:
+                    self.segments[index][2] += len(block)
+                    self.downloaded += len(block)
+                self._report()
+                self._save_state(force=False)
+
+    def _report(self):
+        if self.progress_callback:
+            self.progress_callback(self.downloaded, self.total_size)
+
+    def _verify(self):
+        if not self.expected_hash:
+            return
+        digest = hashlib.new(self.hash_algorithm)
+        with open(self.part_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        if digest.hexdigest().lower() != self.expected_hash.lower():
+            os.remove(self.part_path)
+            if os.path.exists(self.state_path):
+                os.remove(self.state_path)
+            raise DownloadError(f"Checksum mismatch for {os.path.basename(self.dest_path)}")
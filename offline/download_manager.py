@@ -0,0 +1,109 @@
+import heapq
+import itertools
+from PyQt6.QtCore import QObject, pyqtSignal
+from download_engine import RateLimiter
+from model_downloader import ModelDownloader
+
+# Runs up to max_concurrent ModelDownloaders at once and queues the rest by
+# priority (higher first, then first come first served). All downloads share
+# one RateLimiter so the bandwidth cap applies to their sum.
+class DownloadManager(QObject):
+    QUEUED = 'Queued'
+    DOWNLOADING = 'Downloading'
+    PAUSED = 'Paused'
+    DONE = 'Done'
+    FAILED = 'Failed'
+    CANCELED = 'Canceled'
+
+    stateChanged = pyqtSignal(str, str)
+    progress = pyqtSignal(str, int)
+    completed = pyqtSignal(str, bool, str)
+
+    def __init__(self, download_dir, max_concurrent=2, bandwidth_limit_kbps=0):
+        super().__init__()
+        self.download_dir = download_dir
+        self.max_concurrent = max(1, max_concurrent)
+        self.rate_limiter = RateLimiter(bandwidth_limit_kbps * 1024)
+        self.queue = []
+        self.priorities = {}
+        self.order = itertools.count()
+        self.active = {}
+        self.states = {}
+
+    def enqueue(self, model_name, priority=0):
+        if model_name in self.active:
+            return
+        if model_name in self.priorities:
+            if priority <= self.priorities[model_name]:
+                return
+        self.priorities[model_name] = priority
+        heapq.heappush(self.queue, (-priority, next(self.order), model_name))
+        self.setState(model_name, self.QUEUED)
+        self.startNext()
+
+    def prioritize(self, model_name):
+        if model_name in self.priorities:
+            self.enqueue(model_name, max(self.priorities.values()) + 1)
+
+    def startNext(self):
+        while len(self.active) < self.max_concurrent and self.queue:
+            priority, _, model_name = heapq.heappop(self.queue)
+            # Skip stale heap entries left behind by prioritize() or cancel()
+            if self.priorities.get(model_name) != -priority:
+                continue
+            del self.priorities[model_name]
+            downloader = ModelDownloader(model_name, self.download_dir, rate_limiter=self.rate_limiter)
+            downloader.progress.connect(lambda value, name=model_name: self.progress.emit(name, value))
+            downloader.completed.connect(
+                lambda success, message, name=model_name: self.onDownloaderComplete(name, success, message))
+            self.active[model_name] = downloader
+            self.setState(model_name, self.DOWNLOADING)
+            downloader.start()
+
+    def onDownloaderComplete(self, model_name, success, message):
+        downloader = self.active.pop(model_name, None)
+        if downloader:
+            downloader.wait()
+        if success:
+            self.setState(model_name, self.DONE)
+        elif downloader and downloader.isCanceled():
+            self.setState(model_name, self.CANCELED)
+        else:
+            self.setState(model_name, self.FAILED)
+        self.completed.emit(model_name, success, message)
+        self.startNext()
+
+    def pause(self, model_name):
+        if model_name in self.active:
+            self.active[model_name].pause()
+            self.setState(model_name, self.PAUSED)
+
+    def resume(self, model_name):
+        if model_name in self.active:
+            self.active[model_name].resume()
+            self.setState(model_name, self.DOWNLOADING)
+
+    def cancel(self, model_name):
+        if model_name in self.active:
+            self.active[model_name].cancel()
+        elif self.priorities.pop(model_name, None) is not None:
+            self.setState(model_name, self.CANCELED)
+            self.completed.emit(model_name, False, "Download canceled")
+
+    def cancelAll(self):
+        for model_name in list(self.priorities) + list(self.active):
+            self.cancel(model_name)
+        for downloader in list(self.active.values()):
+            downloader.wait()
+
+    def setLimits(self, max_concurrent, bandwidth_limit_kbps):
+        self.max_concurrent = max(1, max_concurrent)
+        self.rate_limiter.set_rate(bandwidth_limit_kbps * 1024)
+        self.startNext()
+
+    def isPending(self, model_name):
+        return model_name in self.active or model_name in self.priorities
+
+    def setState(self, model_name, state):
+        self.states[model_name] = state
+        self.stateChanged.emit(model_name, state)
@@ -0,0 +1,92 @@
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
+                             QTableWidget, QTableWidgetItem, QProgressBar, QHeaderView)
+from PyQt6.QtCore import Qt
+from download_manager import DownloadManager
+
+class DownloadPanel(QWidget):
+    def __init__(self, download_manager, describe_model, parent=None):
+        super().__init__(parent)
+        self.download_manager = download_manager
+        self.describe_model = describe_model
+        self.rows = {}
+        self.initUI()
+        self.download_manager.stateChanged.connect(self.onStateChanged)
+        self.download_manager.progress.connect(self.onProgress)
+
+    def initUI(self):
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(QLabel("Downloads:"))
+
+        self.table = QTableWidget(0, 3)
+        self.table.setHorizontalHeaderLabels(["Voice", "Status", "Progress"])
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        for label, handler in (('Pause', self.download_manager.pause),
+                               ('Resume', self.download_manager.resume),
+                               ('Cancel', self.download_manager.cancel),
+                               ('Download Next', self.download_manager.prioritize)):
+            button = QPushButton(label)
+            button.clicked.connect(lambda checked, handler=handler: self.applyToSelected(handler))
+            buttons.addWidget(button)
+        clear_button = QPushButton('Clear Finished')
+        clear_button.clicked.connect(self.clearFinished)
+        buttons.addWidget(clear_button)
+        layout.addLayout(buttons)
+
+        self.setLayout(layout)
+        self.setVisible(False)
+
+    def selectedModel(self):
+        for model_name, row in self.rows.items():
+            if self.table.item(row, 0).isSelected():
+                return model_name
+        return None
+
+    def applyToSelected(self, handler):
+        model_name = self.selectedModel()
+        if model_name:
+            handler(model_name)
+
+    def addRow(self, model_name):
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        name_item = QTableWidgetItem(self.describe_model(model_name) or model_name)
+        name_item.setToolTip(model_name)
+        self.table.setItem(row, 0, name_item)
+        self.table.setItem(row, 1, QTableWidgetItem(""))
+        progress_bar = QProgressBar()
+        progress_bar.setValue(0)
+        self.table.setCellWidget(row, 2, progress_bar)
+        self.rows[model_name] = row
+        self.setVisible(True)
+        return row
+
+    def onStateChanged(self, model_name, state):
+        row = self.rows.get(model_name)
+        if row is None:
+            row = self.addRow(model_name)
+        self.table.item(row, 1).setText(state)
+        if state == DownloadManager.DONE:
+            self.table.cellWidget(row, 2).setValue(100)
+
+    def onProgress(self, model_name, value):
+        row = self.rows.get(model_name)
+        if row is not None:
+            self.table.cellWidget(row, 2).setValue(value)
+
+    def clearFinished(self):
+        finished = (DownloadManager.DONE, DownloadManager.FAILED, DownloadManager.CANCELED)
+        for model_name in [name for name, row in self.rows.items()
+                           if self.table.item(row, 1).text() in finished]:
+            self.table.removeRow(self.rows.pop(model_name))
+            # Rows below the removed one shift up
+            self.rows = {name: index for index, name in enumerate(
+                sorted(self.rows, key=self.rows.get))}
+        self.setVisible(bool(self.rows))
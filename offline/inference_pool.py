@@ -0,0 +1,167 @@
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+import shared_path
+from audio_buffer import AudioBuffer
+from model_index import ModelIndex, load_model
+from sentence_batcher import group_by_length, synthesize_batch
+from sentence_splitter import split_sentences
+from settings_manager import SettingsManager
+from synthesis_engine import EngineCapabilities, SynthesisEngine, canceled_check
+
+# The model a pool worker synthesizes with. With the fork start method it is
+# loaded once in the parent before the pool starts, so workers inherit the
+# weights copy-on-write instead of each reading them from disk again.
+_worker_tts = None
+
+def _init_worker(model_name, model_paths, threads_per_worker):
+    global _worker_tts
+    try:
+        import torch
+        torch.set_num_threads(threads_per_worker)
+    except ImportError:
+        pass
+    if _worker_tts is None:
+        model_index = ModelIndex(model_paths)
+        model_index.scan()
+        _worker_tts = load_model(model_name, model_index)
+
+def _synthesize_batch(sentences):
+    return [(buffer.samples, buffer.sample_rate) for buffer in synthesize_batch(_worker_tts, sentences)]
+
+# Fans sentences out over a pool of processes that each hold a loaded model
+# and hands the audio back in the original order
+class InferencePool:
+    def __init__(self, model_name, model_paths=(), processes=None, start_method=None):
+        global _worker_tts
+        self.model_name = model_name
+        self.processes = processes or os.cpu_count() or 1
+        available = multiprocessing.get_all_start_methods()
+        if start_method is None:
+            start_method = 'fork' if 'fork' in available else 'spawn'
+        context = multiprocessing.get_context(start_method)
+        if start_method == 'fork' and _worker_tts is None:
+            model_index = ModelIndex(model_paths)
+            model_index.scan()
+            _worker_tts = load_model(model_name, model_index)
+        threads_per_worker = max(1, (os.cpu_count() or 1) // self.processes)
+        self.pool = context.Pool(self.processes, initializer=_init_worker,
+                                 initargs=(model_name, list(model_paths), threads_per_worker))
+
+    # Each task is a batch of similar-length sentences; results are yielded in
+    # input order as soon as every sentence before them is done
+    def synthesize_many(self, sentences, batch_size=1):
+        sentences = list(sentences)
+        batches = group_by_length(sentences, batch_size) if batch_size > 1 else [[index] for index in range(len(sentences))]
+        tasks = [[sentences[index] for index in batch] for batch in batches]
+        ready = {}
+        next_index = 0
+        for batch, results in zip(batches, self.pool.imap(_synthesize_batch, tasks)):
+            for index, (samples, sample_rate) in zip(batch, results):
+                ready[index] = AudioBuffer(samples, sample_rate)
+            while next_index in ready:
+                yield ready.pop(next_index)
+                next_index += 1
+
+    def synthesize(self, text, batch_size=1):
+        return AudioBuffer.concatenate(list(self.synthesize_many(split_sentences(text), batch_size)))
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def terminate(self):
+        self.pool.terminate()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+# The coqui engine with inference spread over a pool, so pooled synthesis
+# gets the sentence cache, speech rate and tracing of every other engine
+class PooledEngine(SynthesisEngine):
+    name = 'coqui'
+
+    def __init__(self, pool, cache=None, batch_size=8):
+        super().__init__(cache, batch_size)
+        self.pool = pool
+
+    def cache_id(self):
+        return self.pool.model_name
+
+    # The workers render a window's sentences side by side
+    def capabilities(self):
+        return EngineCapabilities(self.name, offline=True, batching=True, parallel_requests=self.pool.processes,
+                                  max_segment_chars=self.max_segment_chars)
+
+    def synthesize_batch(self, segments, cancel_event=None, progress=None):
+        canceled_check(cancel_event)()
+        buffers = []
+        for buffer in self.pool.synthesize_many(segments, self.batch_size):
+            if progress:
+                progress.advance(1, audio_seconds=buffer.duration)
+            buffers.append(buffer)
+        return buffers
+
+    def close(self):
+        self.pool.close()
+
+def measure_scaling(model_name, text, process_counts, model_paths=(), batch_size=1):
+    sentences = split_sentences(text)
+    results = []
+    for processes in process_counts:
+        with InferencePool(model_name, model_paths, processes) as pool:
+            # Warm every worker up so pool start-up isn't counted
+            list(pool.synthesize_many(sentences[:processes]))
+            started_at = time.perf_counter()
+            audio_seconds = sum(buffer.duration for buffer in pool.synthesize_many(sentences, batch_size))
+            elapsed = time.perf_counter() - started_at
+        results.append({
+            'processes': processes,
+            'seconds': elapsed,
+            'chars_per_second': len(text) / elapsed if elapsed else 0.0,
+            'real_time_factor': elapsed / audio_seconds if audio_seconds else 0.0,
+        })
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure how synthesis throughput scales with worker processes.")
+    parser.add_argument('text_file', help="Text to synthesize for the measurement")
+    parser.add_argument('-m', '--model', required=True, help="TTS model name")
+    parser.add_argument('-p', '--processes', default=None,
+                        help="Comma separated process counts (default: 1, 2, 4 ... up to the core count)")
+    parser.add_argument('-b', '--batch-size', type=int, default=1, help="Sentences per forward pass")
+    args = parser.parse_args(argv)
+
+    cores = os.cpu_count() or 1
+    if args.processes:
+        process_counts = [int(count) for count in args.processes.split(',')]
+    else:
+        process_counts = []
+        count = 1
+        while count < cores:
+            process_counts.append(count)
+            count *= 2
+        process_counts.append(cores)
+    with open(args.text_file, 'r', encoding='utf-8') as f:
+        text = f.read()
+
+    results = measure_scaling(args.model, text, process_counts, SettingsManager().get_model_paths(),
+                              args.batch_size)
+    baseline = results[0]['chars_per_second'] or 1.0
+    print(f"{'processes':>9} {'seconds':>9} {'chars/sec':>10} {'RTF':>7} {'speedup':>8}  ({cores} cores)")
+    for result in results:
+        print(f"{result['processes']:>9} {result['seconds']:>9.2f} {result['chars_per_second']:>10.1f} "
+              f"{result['real_time_factor']:>7.3f} {result['chars_per_second'] / baseline:>7.2f}x")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,9 +1,64 @@
 import sys
+import time
+
+STARTED_AT = time.perf_counter()
+
 from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QObject, QEvent, QThread
+import shared_path
+import lazy_imports
 from tts_app import TTSApp
 
+IMPORTED_AT = time.perf_counter()
+
+# Imports TTS/torch and pydub in the background once the window is up
+class WarmUpThread(QThread):
+    def __init__(self):
+        super().__init__()
+        self.timings = {}
+
+    def run(self):
+        self.timings = lazy_imports.warm_up()
+
+class FirstPaintWatcher(QObject):
+    def __init__(self, on_first_paint):
+        super().__init__()
+        self.on_first_paint = on_first_paint
+        self.painted = False
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint and not self.painted:
+            self.painted = True
+            self.on_first_paint(time.perf_counter())
+        return False
+
+def print_timing(label, seconds):
+    print(f"{label:<36}{seconds * 1000:9.1f} ms")
+
 if __name__ == '__main__':
+    profile_startup = '--profile-startup' in sys.argv
     app = QApplication(sys.argv)
     ex = TTSApp()
+    constructed_at = time.perf_counter()
+
+    if profile_startup:
+        print_timing("imports", IMPORTED_AT - STARTED_AT)
+        print_timing("construct window", constructed_at - IMPORTED_AT)
+        watcher = FirstPaintWatcher(lambda at: print_timing("first paint", at - STARTED_AT))
+        ex.installEventFilter(watcher)
+
     ex.show()
-    sys.exit(app.exec())
\ No newline at end of file
+
+    warm_up = WarmUpThread()
+    if profile_startup:
+        def report_warm_up():
+            for name, seconds in warm_up.timings.items():
+                print_timing(f"background import {name}", seconds)
+            print_timing("ready for first play", time.perf_counter() - STARTED_AT)
+            app.quit()
+        warm_up.finished.connect(report_warm_up)
+    warm_up.start()
+
+    exit_code = app.exec()
+    warm_up.wait()
+    sys.exit(exit_code)
@@ -0,0 +1,74 @@
+import threading
+from collections import OrderedDict
+
+# Keeps recently used TTS instances loaded so switching back to a voice is
+# instant. Bounded both by entry count and by an estimate of their memory.
+class ModelCache:
+    def __init__(self, max_entries=3, max_memory_mb=2048):
+        self.max_entries = max_entries
+        self.max_memory = max_memory_mb * 1024 * 1024
+        self.models = OrderedDict()
+        self.sizes = {}
+        self.lock = threading.Lock()
+
+    def get(self, model_name):
+        with self.lock:
+            tts = self.models.get(model_name)
+            if tts is not None:
+                self.models.move_to_end(model_name)
+            return tts
+
+    def put(self, model_name, tts):
+        size = estimate_model_memory(tts)
+        with self.lock:
+            self.models[model_name] = tts
+            self.models.move_to_end(model_name)
+            self.sizes[model_name] = size
+            self._evict()
+
+    def get_or_load(self, model_name, load):
+        tts = self.get(model_name)
+        if tts is None:
+            tts = load(model_name)
+            self.put(model_name, tts)
+        return tts
+
+    def resize(self, max_entries, max_memory_mb):
+        with self.lock:
+            self.max_entries = max_entries
+            self.max_memory = max_memory_mb * 1024 * 1024
+            self._evict()
+
+    def memory_used(self):
+        with self.lock:
+            return sum(self.sizes.values())
+
+    def names(self):
+        with self.lock:
+            return list(self.models)
+
+    def __contains__(self, model_name):
+        with self.lock:
+            return model_name in self.models
+
+    def __len__(self):
+        with self.lock:
+            return len(self.models)
+
+    def _evict(self):
+        # The most recently used model always stays, even if it alone is over budget
+        while len(self.models) > 1 and (len(self.models) > self.max_entries
+                                        or sum(self.sizes.values()) > self.max_memory):
+            model_name, _ = self.models.popitem(last=False)
+            del self.sizes[model_name]
+
+def estimate_model_memory(tts):
+    synthesizer = getattr(tts, 'synthesizer', None)
+    modules = [getattr(synthesizer, name, None) for name in ('tts_model', 'vocoder_model', 'vc_model')]
+    total = 0
+    for module in modules:
+        if module is None or not hasattr(module, 'parameters'):
+            continue
+        for tensor in list(module.parameters()) + list(module.buffers()):
+            total += tensor.numel() * tensor.element_size()
+    return total
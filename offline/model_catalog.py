@@ -0,0 +1,80 @@
+import json
+import os
+import time
+from PyQt6.QtCore import QThread, pyqtSignal
+from lazy_imports import tts_api
+
+def describe_model(model_name):
+    parts = model_name.split('/')
+    if len(parts) < 3:
+        return None
+    language = parts[1]
+    details = parts[2].split('_')
+
+    gender = "Unknown"
+    age = "Adult"
+
+    if "male" in details:
+        gender = "Male"
+    elif "female" in details:
+        gender = "Female"
+
+    if "child" in details:
+        age = "Child"
+    elif "senior" in details or "elder" in details:
+        age = "Senior"
+
+    return f"{age} {gender} ({language.capitalize()})"
+
+# Local JSON copy of the model list so startup doesn't have to enumerate
+# the TTS catalog before the window shows
+class ModelCatalog:
+    def __init__(self, index_file, max_age=24 * 60 * 60):
+        self.index_file = index_file
+        self.max_age = max_age
+        self.updated_at = 0
+        self.model_names = []
+
+    def load(self):
+        if os.path.exists(self.index_file):
+            try:
+                with open(self.index_file, 'r') as f:
+                    index = json.load(f)
+                self.updated_at = index.get('updated_at', 0)
+                self.model_names = index.get('models', [])
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable model catalog: {str(e)}")
+        return self.model_names
+
+    def save(self, model_names):
+        self.model_names = list(model_names)
+        self.updated_at = time.time()
+        os.makedirs(os.path.dirname(self.index_file) or '.', exist_ok=True)
+        temp_file = self.index_file + '.tmp'
+        with open(temp_file, 'w') as f:
+            json.dump({'updated_at': self.updated_at, 'models': self.model_names}, f)
+        os.replace(temp_file, self.index_file)
+
+    def is_stale(self):
+        return not self.model_names or time.time() - self.updated_at > self.max_age
+
+class CatalogRefresher(QThread):
+    modelsFound = pyqtSignal(list)
+    completed = pyqtSignal(bool, str)
+
+    def __init__(self, catalog, batch_size=25):
+        super().__init__()
+        self.catalog = catalog
+        self.batch_size = batch_size
+
+    def run(self):
+        try:
+            tts_instance = tts_api.TTS()
+            model_manager = tts_instance.list_models()
+            model_names = model_manager.list_models()
+            for start in range(0, len(model_names), self.batch_size):
+                self.modelsFound.emit(model_names[start:start + self.batch_size])
+            self.catalog.save(model_names)
+            self.completed.emit(True, "")
+        except Exception as e:
+            self.completed.emit(False, str(e))
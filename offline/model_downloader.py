@@ -0,0 +1,196 @@
+import os
+import shutil
+import threading
+import urllib.parse
+import zipfile
+from PyQt6.QtCore import QThread, pyqtSignal
+from lazy_imports import tts_api
+from download_engine import DownloadEngine, DownloadCanceled, DownloadError
+
+# Looks up the download URLs the TTS model manager would use for a model and
+# its default vocoder, with the MD5 the catalog lists for the model's archive
+# (None when it has none). Returns None when the catalog entry has a layout we
+# don't know, so the caller can fall back to letting TTS download it.
+def resolve_downloads(model_name):
+    manager = tts_api.TTS().list_models()
+    downloads = []
+    pending = [model_name]
+    while pending:
+        name = pending.pop(0)
+        model_item, model_full_name, _, md5sum = manager._set_model_item(name)
+        urls = model_item.get('model_url')
+        if not urls:
+            return None
+        if isinstance(urls, str):
+            urls = [urls]
+        output_path = os.path.join(manager.output_prefix, model_full_name)
+        if not os.path.isdir(output_path):
+            downloads.append((name, urls, output_path, md5sum))
+        vocoder = model_item.get('default_vocoder')
+        if vocoder and vocoder not in pending:
+            pending.append(vocoder)
+    return downloads
+
+# Models some downloader is fetching right now, shared by all of them: two
+# models with the same default vocoder would otherwise both download it into
+# the same staging directory and remove each other's files
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+class ModelDownloader(QThread):
+    progress = pyqtSignal(int)
+    completed = pyqtSignal(bool, str)
+
+    def __init__(self, model_name, download_dir, connections=4, rate_limiter=None):
+        super().__init__()
+        self.model_name = model_name
+        self.download_dir = download_dir
+        self.connections = connections
+        self.rate_limiter = rate_limiter
+        self.engine = None
+        self._is_paused = False
+        self._is_canceled = False
+        self._last_percent = -1
+
+    def run(self):
+        try:
+            try:
+                downloads = self.runCancelable(resolve_downloads, self.model_name)
+            except (AttributeError, KeyError, TypeError, ValueError):
+                downloads = None
+            if downloads is None:
+                self.runCancelable(lambda: tts_api.TTS(model_name=self.model_name))
+            else:
+                for index, (name, urls, output_path, md5sum) in enumerate(downloads):
+                    self.fetchShared(name, urls, output_path, md5sum, index, len(downloads))
+            self.completed.emit(True, "")
+        except DownloadCanceled:
+            self.completed.emit(False, "Download canceled")
+        except Exception as e:
+            self.completed.emit(False, str(e))
+
+    # Importing TTS, the model manager's catalog lookup and TTS's own download
+    # can't be interrupted, so they run on a daemon thread that is left behind
+    # on cancel; the downloader itself (and closing the app) doesn't wait
+    def runCancelable(self, function, *args):
+        if self._is_canceled:
+            raise DownloadCanceled("Download canceled")
+        outcome = {}
+
+        def call():
+            try:
+                outcome['result'] = function(*args)
+            except BaseException as e:
+                outcome['error'] = e
+
+        thread = threading.Thread(target=call, daemon=True)
+        thread.start()
+        while thread.is_alive():
+            thread.join(0.1)
+            if self._is_canceled:
+                raise DownloadCanceled("Download canceled")
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome.get('result')
+
+    # Fetches a model unless another downloader already is; then waits for
+    # that one instead and only takes over if it failed
+    def fetchShared(self, model_name, urls, output_path, md5sum, model_index, model_count):
+        while True:
+            with _in_flight_lock:
+                done = _in_flight.get(model_name)
+                if done is None:
+                    done = _in_flight[model_name] = threading.Event()
+                    break
+            while not done.wait(0.1):
+                if self._is_canceled:
+                    raise DownloadCanceled("Download canceled")
+            if os.path.isdir(output_path):
+                return
+        try:
+            self.fetchModel(model_name, urls, output_path, md5sum, model_index, model_count)
+        finally:
+            with _in_flight_lock:
+                del _in_flight[model_name]
+            done.set()
+
+    # The catalog's MD5 covers the model's archive, so it is only checked when
+    # the model is a single download
+    def fetchModel(self, model_name, urls, output_path, md5sum, model_index, model_count):
+        staging_dir = os.path.join(self.download_dir, model_name.replace('/', '--'))
+        extract_dir = os.path.join(staging_dir, 'extracted')
+        os.makedirs(staging_dir, exist_ok=True)
+        shutil.rmtree(extract_dir, ignore_errors=True)
+        os.makedirs(extract_dir)
+        expected_hash = md5sum if len(urls) == 1 else None
+
+        for url_index, url in enumerate(urls):
+            file_name = os.path.basename(urllib.parse.urlparse(url).path) or f"file_{url_index}"
+            file_path = os.path.join(staging_dir, file_name)
+            if not os.path.exists(file_path):
+                step = model_index * len(urls) + url_index
+                steps = model_count * len(urls)
+                self.engine = DownloadEngine(
+                    url, file_path, connections=self.connections, expected_hash=expected_hash,
+                    hash_algorithm='md5', rate_limiter=self.rate_limiter,
+                    progress_callback=lambda done, total: self.reportProgress(done, total, step, steps))
+                if self._is_paused:
+                    self.engine.pause()
+                if self._is_canceled:
+                    raise DownloadCanceled("Download canceled")
+                self.engine.run()
+
+            if zipfile.is_zipfile(file_path):
+                self.extractFlat(file_path, extract_dir)
+            else:
+                shutil.copyfile(file_path, os.path.join(extract_dir, file_name))
+        # The model manager keeps the hash next to the model to tell when the
+        # catalog has a newer version
+        if md5sum:
+            with open(os.path.join(extract_dir, 'hash.md5'), 'w') as f:
+                f.write(md5sum)
+
+        if os.path.isdir(output_path):
+            shutil.rmtree(output_path)
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        shutil.move(extract_dir, output_path)
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+    # Same layout the TTS model manager produces: every file at the top level
+    def extractFlat(self, zip_path, output_dir):
+        with zipfile.ZipFile(zip_path) as archive:
+            bad_member = archive.testzip()
+            if bad_member is not None:
+                os.remove(zip_path)
+                raise DownloadError(f"Corrupt download: {bad_member} failed its CRC check")
+            for member in archive.infolist():
+                if member.is_dir():
+                    continue
+                with archive.open(member) as src, open(os.path.join(output_dir, os.path.basename(member.filename)), 'wb') as dst:
+                    shutil.copyfileobj(src, dst)
+
+    def reportProgress(self, downloaded, total_size, step, steps):
+        if not total_size:
+            return
+        percent = int((step + downloaded / total_size) * 100 / steps)
+        if percent != self._last_percent:
+            self._last_percent = percent
+            self.progress.emit(percent)
+
+    def pause(self):
+        self._is_paused = True
+        if self.engine:
+            self.engine.pause()
+
+    def resume(self):
+        self._is_paused = False
+        if self.engine:
+            self.engine.resume()
+
+    def cancel(self):
+        self._is_canceled = True
+        if self.engine:
+            self.engine.cancel()
+
+    def isCanceled(self):
+        return self._is_canceled
@@ -0,0 +1,168 @@
+import hashlib
+import os
+import sys
+import threading
+from lazy_imports import tts_api
+from tracing import span
+
+MODEL_FILE_EXTENSIONS = ('.pth', '.pt', '.tar', '.onnx', '.bin')
+
+def default_tts_cache_dir():
+    # Same lookup as TTS.utils.generic_utils.get_user_data_dir("tts"), without importing TTS
+    if os.environ.get('TTS_HOME'):
+        return os.path.join(os.environ['TTS_HOME'], 'tts')
+    if os.environ.get('XDG_DATA_HOME'):
+        return os.path.join(os.environ['XDG_DATA_HOME'], 'tts')
+    if sys.platform == 'win32':
+        return os.path.join(os.environ.get('APPDATA', os.path.expanduser('~')), 'tts')
+    if sys.platform == 'darwin':
+        return os.path.join(os.path.expanduser('~'), 'Library', 'Application Support', 'tts')
+    return os.path.join(os.path.expanduser('~'), '.local', 'share', 'tts')
+
+class ModelInfo:
+    def __init__(self, model_name, path, source, size, mtime):
+        self.model_name = model_name
+        self.path = path
+        self.source = source
+        self.size = size
+        self.mtime = mtime
+        self.checksum = None
+
+# Answers "is this model installed, and where" from a dict built by scanning
+# the TTS download cache and the user's model paths once. refresh() only
+# rescans directories whose mtime changed since the last scan.
+class ModelIndex:
+    CACHE = 'cache'
+    CUSTOM = 'custom'
+
+    def __init__(self, model_paths, cache_dir=None, max_depth=4):
+        self.cache_dir = cache_dir or default_tts_cache_dir()
+        self.model_paths = list(model_paths)
+        self.max_depth = max_depth
+        self.models = {}
+        self.root_mtimes = {}
+        self.lock = threading.Lock()
+
+    def roots(self):
+        return [(self.cache_dir, self.CACHE)] + [(path, self.CUSTOM) for path in self.model_paths]
+
+    def set_model_paths(self, model_paths):
+        self.model_paths = list(model_paths)
+        self.scan()
+
+    def scan(self):
+        models = {}
+        root_mtimes = {}
+        # Later roots win, so user paths take precedence over the download cache
+        for root, source in self.roots():
+            root_mtimes[root] = dir_mtime(root)
+            models.update(self._scan_root(root, source))
+        with self.lock:
+            self.models = models
+            self.root_mtimes = root_mtimes
+
+    def refresh(self):
+        # A model added to or removed from a root changes the root's mtime
+        for root, _ in self.roots():
+            if self.root_mtimes.get(root) != dir_mtime(root):
+                self.scan()
+                return True
+        # Otherwise only re-describe model directories that were touched
+        with self.lock:
+            infos = list(self.models.values())
+        changed = False
+        for info in infos:
+            if dir_mtime(info.path) == info.mtime:
+                continue
+            changed = True
+            with self.lock:
+                if os.path.isdir(info.path):
+                    self.models[info.model_name] = self._describe(info.model_name, info.path, info.source)
+                else:
+                    self.models.pop(info.model_name, None)
+        return changed
+
+    def _scan_root(self, root, source):
+        found = {}
+        if not os.path.isdir(root):
+            return found
+        if source == self.CACHE:
+            # The TTS manager stores "tts_models/en/ljspeech/vits" as "tts_models--en--ljspeech--vits"
+            for entry in os.scandir(root):
+                if entry.is_dir() and '--' in entry.name:
+                    model_name = entry.name.replace('--', '/')
+                    found[model_name] = self._describe(model_name, entry.path, source)
+            return found
+        for directory, subdirs, files in os.walk(root):
+            depth = os.path.relpath(directory, root).count(os.sep)
+            if depth >= self.max_depth:
+                subdirs[:] = []
+            if directory != root and any(name.endswith(MODEL_FILE_EXTENSIONS) for name in files):
+                model_name = os.path.relpath(directory, root).replace(os.sep, '/').replace('--', '/')
+                found[model_name] = self._describe(model_name, directory, source)
+                subdirs[:] = []
+        return found
+
+    def _describe(self, model_name, path, source):
+        size = 0
+        for directory, _, files in os.walk(path):
+            for name in files:
+                try:
+                    size += os.path.getsize(os.path.join(directory, name))
+                except OSError:
+                    pass
+        return ModelInfo(model_name, path, source, size, dir_mtime(path))
+
+    def info(self, model_name):
+        with self.lock:
+            return self.models.get(model_name)
+
+    def is_installed(self, model_name):
+        with self.lock:
+            return model_name in self.models
+
+    def location(self, model_name):
+        info = self.info(model_name)
+        return info.path if info else None
+
+    def custom_location(self, model_name):
+        info = self.info(model_name)
+        if info and info.source == self.CUSTOM:
+            return info.path
+        return None
+
+    def installed_models(self):
+        with self.lock:
+            return list(self.models)
+
+    def checksum(self, model_name):
+        info = self.info(model_name)
+        if info is None:
+            return None
+        if info.checksum is None:
+            info.checksum = directory_checksum(info.path)
+        return info.checksum
+
+def load_model(model_name, model_index=None):
+    model_path = model_index.custom_location(model_name) if model_index else None
+    with span('model.load', model=model_name):
+        if model_path:
+            return tts_api.TTS(model_path=model_path)
+        return tts_api.TTS(model_name=model_name)
+
+def dir_mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+def directory_checksum(path, block_size=1024 * 1024):
+    digest = hashlib.sha256()
+    for directory, subdirs, files in os.walk(path):
+        subdirs.sort()
+        for name in sorted(files):
+            digest.update(os.path.relpath(os.path.join(directory, name), path).encode('utf-8'))
+            with open(os.path.join(directory, name), 'rb') as f:
+                for block in iter(lambda: f.read(block_size), b''):
+                    digest.update(block)
+    return digest.hexdigest()
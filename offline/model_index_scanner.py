@@ -0,0 +1,17 @@
+from PyQt6.QtCore import QThread, pyqtSignal
+
+# Runs a ModelIndex's first full scan off the GUI thread; sizing every
+# installed model's files grows with the number of models
+class ModelIndexScanner(QThread):
+    completed = pyqtSignal(bool, str)
+
+    def __init__(self, model_index):
+        super().__init__()
+        self.model_index = model_index
+
+    def run(self):
+        try:
+            self.model_index.scan()
+            self.completed.emit(True, "")
+        except Exception as e:
+            self.completed.emit(False, str(e))
@@ -1,5 +1,5 @@
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, 
-                             QPushButton, QListWidget, QMessageBox)
+                             QPushButton, QListWidget, QMessageBox, QSpinBox)
 from PyQt6.QtCore import Qt
 
 class SettingsDialog(QDialog):
@@ -39,6 +39,62 @@ class SettingsDialog(QDialog):
         remove_button.clicked.connect(self.remove_path)
         layout.addWidget(remove_button)
 
+        # Loaded model cache limits
+        cache_layout = QHBoxLayout()
+        cache_layout.addWidget(QLabel("Voices kept loaded:"))
+        self.cache_size_input = QSpinBox()
+        self.cache_size_input.setRange(1, 20)
+        self.cache_size_input.setValue(self.settings_manager.get_model_cache_size())
+        self.cache_size_input.valueChanged.connect(self.update_cache_limits)
+        cache_layout.addWidget(self.cache_size_input)
+        cache_layout.addWidget(QLabel("Memory limit (MB):"))
+        self.cache_memory_input = QSpinBox()
+        self.cache_memory_input.setRange(256, 65536)
+        self.cache_memory_input.setSingleStep(256)
+        self.cache_memory_input.setValue(self.settings_manager.get_model_cache_memory())
+        self.cache_memory_input.valueChanged.connect(self.update_cache_limits)
+        cache_layout.addWidget(self.cache_memory_input)
+        layout.addLayout(cache_layout)
+
+        # Download limits
+        download_layout = QHBoxLayout()
+        download_layout.addWidget(QLabel("Parallel downloads:"))
+        self.parallel_downloads_input = QSpinBox()
+        self.parallel_downloads_input.setRange(1, 8)
+        self.parallel_downloads_input.setValue(self.settings_manager.get_max_concurrent_downloads())
+        self.parallel_downloads_input.valueChanged.connect(self.update_download_limits)
+        download_layout.addWidget(self.parallel_downloads_input)
+        download_layout.addWidget(QLabel("Bandwidth limit (KB/s, 0 = none):"))
+        self.bandwidth_input = QSpinBox()
+        self.bandwidth_input.setRange(0, 1000000)
+        self.bandwidth_input.setSingleStep(100)
+        self.bandwidth_input.setValue(self.settings_manager.get_bandwidth_limit())
+        self.bandwidth_input.valueChanged.connect(self.update_download_limits)
+        download_layout.addWidget(self.bandwidth_input)
+        layout.addLayout(download_layout)
+
+        # Speech rate
+        rate_layout = QHBoxLayout()
+        rate_layout.addWidget(QLabel("Speech rate (words per minute, 0 = natural):"))
+        self.speech_rate_input = QSpinBox()
+        self.speech_rate_input.setRange(0, 300)
+        self.speech_rate_input.setSingleStep(10)
+        self.speech_rate_input.setValue(self.settings_manager.get_speech_rate())
+        self.speech_rate_input.valueChanged.connect(self.settings_manager.set_speech_rate)
+        rate_layout.addWidget(self.speech_rate_input)
+        layout.addLayout(rate_layout)
+
+        # Batching: more sentences per forward pass is faster overall, but
+        # playback waits for the whole batch; models that can't batch ignore it
+        batch_layout = QHBoxLayout()
+        batch_layout.addWidget(QLabel("Sentences per batch (models that batch):"))
+        self.batch_size_input = QSpinBox()
+        self.batch_size_input.setRange(1, 32)
+        self.batch_size_input.setValue(self.settings_manager.get_batch_size())
+        self.batch_size_input.valueChanged.connect(self.settings_manager.set_batch_size)
+        batch_layout.addWidget(self.batch_size_input)
+        layout.addLayout(batch_layout)
+
         self.setLayout(layout)
         self.setWindowTitle("TTS Settings")
 
@@ -56,6 +112,14 @@ class SettingsDialog(QDialog):
             self.settings_manager.remove_model_path(path)
             self.update_path_list()
 
+    def update_cache_limits(self):
+        self.settings_manager.set_model_cache_limits(self.cache_size_input.value(),
+                                                     self.cache_memory_input.value())
+
+    def update_download_limits(self):
+        self.settings_manager.set_download_limits(self.parallel_downloads_input.value(),
+                                                  self.bandwidth_input.value())
+
     def update_path_list(self):
         self.path_list.clear()
         for path in self.settings_manager.get_model_paths():
@@ -27,4 +27,56 @@ class SettingsManager:
             self.save_settings()
 
     def get_model_paths(self):
-        return self.settings['model_paths']
\ No newline at end of file
+        return self.settings['model_paths']
+
+    def get_model_cache_size(self):
+        return self.settings.get('model_cache_size', 3)
+
+    def get_model_cache_memory(self):
+        return self.settings.get('model_cache_memory_mb', 2048)
+
+    def get_audio_cache_dir(self):
+        default_dir = os.path.join(os.path.expanduser('~'), '.cache', 'noisyquill', 'audio')
+        return self.settings.get('audio_cache_dir', default_dir)
+
+    def get_model_catalog_file(self):
+        default_file = os.path.join(os.path.expanduser('~'), '.cache', 'noisyquill', 'model_catalog.json')
+        return self.settings.get('model_catalog_file', default_file)
+
+    def get_download_dir(self):
+        default_dir = os.path.join(os.path.expanduser('~'), '.cache', 'noisyquill', 'downloads')
+        return self.settings.get('download_dir', default_dir)
+
+    def get_max_concurrent_downloads(self):
+        return self.settings.get('max_concurrent_downloads', 2)
+
+    def get_bandwidth_limit(self):
+        return self.settings.get('bandwidth_limit_kbps', 0)
+
+    def set_download_limits(self, max_concurrent, bandwidth_limit_kbps):
+        self.settings['max_concurrent_downloads'] = max_concurrent
+        self.settings['bandwidth_limit_kbps'] = bandwidth_limit_kbps
+        self.save_settings()
+
+    # Words per minute to stretch speech to; 0 keeps the voice's own pace
+    def get_speech_rate(self):
+        return self.settings.get('speech_rate_wpm', 0)
+
+    def set_speech_rate(self, words_per_minute):
+        self.settings['speech_rate_wpm'] = words_per_minute
+        self.save_settings()
+
+    def get_batch_size(self):
+        return self.settings.get('batch_size', 8)
+
+    def set_batch_size(self, batch_size):
+        self.settings['batch_size'] = batch_size
+        self.save_settings()
+
+    def get_audio_cache_size(self):
+        return self.settings.get('audio_cache_size_mb', 500)
+
+    def set_model_cache_limits(self, max_entries, max_memory_mb):
+        self.settings['model_cache_size'] = max_entries
+        self.settings['model_cache_memory_mb'] = max_memory_mb
+        self.save_settings()
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Modules used by both apps (audio, engines, tracing) live in ../shared.
+# Entry points import this first so they can be found when run from source.
+SHARED_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+
+if os.path.isdir(SHARED_DIR) and SHARED_DIR not in sys.path:
+    sys.path.insert(0, SHARED_DIR)
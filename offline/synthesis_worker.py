@@ -0,0 +1,192 @@
+import itertools
+import queue
+import threading
+import time
+from PyQt6.QtCore import QThread, pyqtSignal
+from coqui_engine import CoquiEngine
+from incremental import IncrementalRenderer
+from progress_channel import ProgressChannel, ProgressTracker
+from streaming_player import StreamingPlayer
+from synthesis_engine import SynthesisCanceled
+from tracing import span
+
+# How often a playing job checks whether it was canceled
+CANCEL_POLL_INTERVAL = 0.05
+
+class SynthesisJob:
+    PLAY = 'play'
+    SAVE = 'save'
+
+    def __init__(self, job_id, kind, model_name, text, save_path=None, words_per_minute=0, incremental=True):
+        self.job_id = job_id
+        self.kind = kind
+        self.model_name = model_name
+        self.text = text
+        self.save_path = save_path
+        self.words_per_minute = words_per_minute
+        # Reuse the audio of sentences unchanged since the last incremental job
+        self.incremental = incremental
+        self.canceled = False
+        self.cancel_event = threading.Event()
+        self.player = None
+
+    # Playback is stopped right away; synthesis stops at its next checkpoint
+    def cancel(self):
+        if not self.canceled:
+            self.canceled = True
+            self.cancel_event.set()
+        if self.player:
+            self.player.stop()
+
+# Runs queued synthesis jobs in order, off the GUI thread
+class SynthesisWorker(QThread):
+    progress = pyqtSignal(object)
+    status = pyqtSignal(int, str)
+    completed = pyqtSignal(int, bool, str)
+    queueChanged = pyqtSignal(int)
+    firstAudio = pyqtSignal(int, float)
+
+    # sink is handed to the player; None plays on the default output
+    def __init__(self, load_model, audio_cache=None, batch_size=8, sink=None):
+        super().__init__()
+        self.load_model = load_model
+        self.sink = sink
+        self.audio_cache = audio_cache
+        self.batch_size = max(1, batch_size)
+        self.jobs = queue.Queue()
+        self.job_ids = itertools.count(1)
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.current_model = None
+        self.engine = None
+        self.renderer = IncrementalRenderer()
+        # Emitting across threads queues an event per call, so updates are
+        # rate limited before they reach the GUI
+        self.progress_channel = ProgressChannel(min_interval=0.1)
+        self.progress_channel.subscribe(self.progress.emit)
+
+    def submit(self, kind, model_name, text, save_path=None, words_per_minute=0, incremental=True):
+        job = SynthesisJob(next(self.job_ids), kind, model_name, text, save_path, words_per_minute, incremental)
+        with self.lock:
+            self.pending[job.job_id] = job
+            pending_count = len(self.pending)
+        self.jobs.put(job)
+        self.queueChanged.emit(pending_count)
+        return job.job_id
+
+    def cancel(self, job_id):
+        with self.lock:
+            job = self.pending.get(job_id)
+            if job:
+                job.cancel()
+
+    def cancelAll(self):
+        with self.lock:
+            for job in self.pending.values():
+                job.cancel()
+
+    def pausePlayback(self):
+        with self.lock:
+            for job in self.pending.values():
+                if job.player:
+                    job.player.pause()
+
+    def resumePlayback(self):
+        with self.lock:
+            for job in self.pending.values():
+                if job.player:
+                    job.player.resume()
+
+    # Takes effect from the next batch the engine synthesizes
+    def setBatchSize(self, batch_size):
+        self.batch_size = max(1, batch_size)
+        if self.engine:
+            self.engine.batch_size = self.batch_size
+
+    def pendingCount(self):
+        with self.lock:
+            return len(self.pending)
+
+    def stop(self):
+        self.cancelAll()
+        self.jobs.put(None)
+        self.wait()
+
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            try:
+                with span(f'job.{job.kind}', job=job.job_id, chars=len(job.text)):
+                    self.runJob(job)
+            except SynthesisCanceled:
+                self.completed.emit(job.job_id, False, "Canceled")
+            except Exception as e:
+                self.completed.emit(job.job_id, False, str(e))
+            finally:
+                with self.lock:
+                    self.pending.pop(job.job_id, None)
+                    pending_count = len(self.pending)
+                self.queueChanged.emit(pending_count)
+
+    def checkCanceled(self, job):
+        if job.canceled:
+            raise SynthesisCanceled()
+
+    def runJob(self, job):
+        self.checkCanceled(job)
+        progress = ProgressTracker(self.progress_channel, job.job_id)
+        progress.set_stage("Starting...")
+
+        if self.current_model != job.model_name:
+            self.status.emit(job.job_id, "Loading model...")
+            progress.set_stage("Loading model...")
+            self.current_model = None
+            try:
+                tts = self.load_model(job.model_name)
+            except Exception as e:
+                raise RuntimeError(f"Failed to load model: {str(e)}")
+            self.engine = CoquiEngine(job.model_name, tts=tts, cache=self.audio_cache, batch_size=self.batch_size)
+            self.renderer.set_engine(self.engine)
+            self.current_model = job.model_name
+        self.checkCanceled(job)
+
+        self.status.emit(job.job_id, "Synthesizing...")
+        if job.kind == SynthesisJob.SAVE:
+            (self.renderer if job.incremental else self.engine).save(job.text, job.save_path, job.words_per_minute, job.cancel_event, progress)
+            progress.finish()
+            self.completed.emit(job.job_id, True, f"Audio saved successfully to {job.save_path}")
+            return
+
+        self.streamJob(job, progress)
+        progress.finish()
+        self.completed.emit(job.job_id, True, "")
+
+    # Synthesizes sentence N+1 while sentence N is playing
+    def streamJob(self, job, progress):
+        started_at = time.perf_counter()
+        player = StreamingPlayer(
+            on_first_audio=lambda at: self.firstAudio.emit(job.job_id, at - started_at),
+            on_underrun=lambda count: self.status.emit(job.job_id, "Waiting for synthesis to catch up..."),
+            sink=self.sink)
+        player.start()
+        with self.lock:
+            job.player = player
+        if job.canceled:
+            player.stop()
+        try:
+            source = self.renderer if job.incremental else self.engine
+            for buffer in source.stream(job.text, job.words_per_minute, job.cancel_event, progress):
+                player.feed(buffer)
+            player.finish()
+            while player.is_alive():
+                if job.canceled:
+                    player.stop()
+                player.join(CANCEL_POLL_INTERVAL)
+            self.checkCanceled(job)
+            if player.error:
+                raise player.error
+        finally:
+            player.stop()
+            player.join()
@@ -1,74 +1,90 @@
 import os
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QTextEdit, QPushButton, QLabel, 
                              QMessageBox, QComboBox, QHBoxLayout, QFileDialog, QProgressBar)
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
-from TTS.api import TTS
-from pydub import AudioSegment
-from pydub.playback import play
+from PyQt6.QtCore import Qt, QFileSystemWatcher
 from settings_manager import SettingsManager
 from settings_dialog import SettingsDialog
-
-class ModelDownloader(QThread):
-    progress = pyqtSignal(int)
-    completed = pyqtSignal(bool, str)
-
-    def __init__(self, model_name):
-        super().__init__()
-        self.model_name = model_name
-
-    def run(self):
-        try:
-            TTS(model_name=self.model_name)
-            self.completed.emit(True, "")
-        except Exception as e:
-            self.completed.emit(False, str(e))
+from model_cache import ModelCache
+from audio_cache import AudioCache
+from model_catalog import ModelCatalog, CatalogRefresher, describe_model
+from model_index import ModelIndex, load_model
+from model_index_scanner import ModelIndexScanner
+from download_manager import DownloadManager
+from download_panel import DownloadPanel
+from synthesis_worker import SynthesisWorker, SynthesisJob
 
 class TTSApp(QWidget):
     def __init__(self):
         super().__init__()
         self.settings_manager = SettingsManager()
+        self.model_cache = ModelCache(self.settings_manager.get_model_cache_size(),
+                                      self.settings_manager.get_model_cache_memory())
         self.progress = 0
-        self.models = self.get_available_models()
+        self.models = {}
         self.current_model = None
-        self.model_downloads = {model: False for model in self.models.values()}
+        self.model_index = ModelIndex(self.settings_manager.get_model_paths())
+        self.modelIndexReady = False
+        self.modelWatcher = QFileSystemWatcher()
+        self.modelWatcher.directoryChanged.connect(self.refreshModelIndex)
+        self.watchModelRoots()
+        self.model_catalog = ModelCatalog(self.settings_manager.get_model_catalog_file())
+        self.download_manager = DownloadManager(self.settings_manager.get_download_dir(),
+                                                self.settings_manager.get_max_concurrent_downloads(),
+                                                self.settings_manager.get_bandwidth_limit())
+        self.download_manager.completed.connect(self.onDownloadComplete)
+        self.audio_cache = AudioCache(self.settings_manager.get_audio_cache_dir(),
+                                      self.settings_manager.get_audio_cache_size())
+        self.synthesisWorker = SynthesisWorker(self.loadModel, self.audio_cache,
+                                               self.settings_manager.get_batch_size())
+        self.synthesisWorker.progress.connect(self.updateSynthesisProgress)
+        self.synthesisWorker.status.connect(self.onSynthesisStatus)
+        self.synthesisWorker.completed.connect(self.onSynthesisComplete)
+        self.synthesisWorker.queueChanged.connect(self.onSynthesisQueueChanged)
+        self.synthesisWorker.firstAudio.connect(self.onFirstAudio)
+        self.synthesisWorker.start()
         self.initUI()
-
-    def get_available_models(self):
-        available_models = {}
-        tts_instance = TTS()
-        model_manager = tts_instance.list_models()
-        model_names = model_manager.list_models()
-        
+        self.addModels(self.model_catalog.load())
+        self.modelIndexScanner = ModelIndexScanner(self.model_index)
+        self.modelIndexScanner.completed.connect(self.onModelIndexScanned)
+        self.modelIndexScanner.start()
+        self.onModelChange()
+        if self.model_catalog.is_stale():
+            self.refreshCatalog()
+
+    def addModels(self, model_names):
         for model_name in model_names:
-            parts = model_name.split('/')
-            if len(parts) >= 3:
-                language = parts[1]
-                details = parts[2].split('_')
-                
-                gender = "Unknown"
-                age = "Adult"
-                
-                if "male" in details:
-                    gender = "Male"
-                elif "female" in details:
-                    gender = "Female"
-                
-                if "child" in details:
-                    age = "Child"
-                elif "senior" in details or "elder" in details:
-                    age = "Senior"
-                
-                key = f"{age} {gender} ({language.capitalize()})"
-                available_models[key] = model_name
-        
-        return available_models
+            key = describe_model(model_name)
+            if key is None:
+                continue
+            if key not in self.models:
+                self.modelCombo.addItem(key)
+            self.models[key] = model_name
+
+    def refreshCatalog(self):
+        self.catalogRefresher = CatalogRefresher(self.model_catalog)
+        self.catalogRefresher.modelsFound.connect(self.addModels)
+        self.catalogRefresher.completed.connect(self.onCatalogRefreshed)
+        self.catalogRefresher.start()
+
+    def onModelIndexScanned(self, success, message):
+        self.modelIndexReady = True
+        if not success:
+            self.showStatusMessage(f"Could not look for installed voices: {message}")
+        # Picks up anything that changed while the scan was running
+        self.model_index.refresh()
+        self.onModelChange()
+
+    def onCatalogRefreshed(self, success, message):
+        if not success:
+            self.showStatusMessage(f"Could not refresh the model list: {message}")
+        elif not self.models:
+            self.showStatusMessage("No voice models found.")
 
     def initUI(self):
         layout = QVBoxLayout()
 
         model_layout = QHBoxLayout()
         self.modelCombo = QComboBox()
-        self.modelCombo.addItems(self.models.keys())
         self.modelCombo.currentIndexChanged.connect(self.onModelChange)
         model_layout.addWidget(QLabel("Select Voice:"))
         model_layout.addWidget(self.modelCombo)
@@ -78,6 +94,9 @@ class TTSApp(QWidget):
         self.downloadButton.clicked.connect(self.downloadModel)
         layout.addWidget(self.downloadButton)
 
+        self.downloadPanel = DownloadPanel(self.download_manager, describe_model)
+        layout.addWidget(self.downloadPanel)
+
         self.previewButton = QPushButton('Preview Voice')
         self.previewButton.clicked.connect(self.previewModel)
         layout.addWidget(self.previewButton)
@@ -93,10 +112,21 @@ class TTSApp(QWidget):
         layout.addWidget(self.saveButton)
         self.saveButton.clicked.connect(self.saveAudio)
 
-        self.progressBar = QProgressBar()
-        self.progressBar.setValue(0)
-        self.progressBar.setVisible(False)
-        layout.addWidget(self.progressBar)
+        self.cancelSynthesisButton = QPushButton('Cancel')
+        self.cancelSynthesisButton.setEnabled(False)
+        layout.addWidget(self.cancelSynthesisButton)
+        self.cancelSynthesisButton.clicked.connect(self.cancelSynthesis)
+
+        self.pausePlaybackButton = QPushButton('Pause')
+        self.pausePlaybackButton.setCheckable(True)
+        self.pausePlaybackButton.setEnabled(False)
+        layout.addWidget(self.pausePlaybackButton)
+        self.pausePlaybackButton.toggled.connect(self.togglePlaybackPaused)
+
+        self.synthesisProgressBar = QProgressBar()
+        self.synthesisProgressBar.setValue(0)
+        self.synthesisProgressBar.setVisible(False)
+        layout.addWidget(self.synthesisProgressBar)
 
         self.statusLabel = QLabel()
         layout.addWidget(self.statusLabel)
@@ -110,106 +140,137 @@ class TTSApp(QWidget):
         self.setWindowTitle('TTS Application')
 
     def onModelChange(self):
-        model_key = self.modelCombo.currentText()
-        model_name = self.models[model_key]
-        if self.model_downloads[model_name]:
+        model_name = self.selectedModel()
+        if model_name is None:
+            return
+        # Until the installed models are known, don't offer to download one
+        if (not self.modelIndexReady or self.model_index.is_installed(model_name)
+                or self.download_manager.isPending(model_name)):
             self.downloadButton.setVisible(False)
         else:
             self.downloadButton.setVisible(True)
         self.update()
 
     def downloadModel(self):
-        model_key = self.modelCombo.currentText()
-        model_name = self.models[model_key]
-
-        self.downloadThread = ModelDownloader(model_name)
-        self.downloadThread.progress.connect(self.updateDownloadProgress)
-        self.downloadThread.completed.connect(self.onDownloadComplete)
-        self.downloadThread.start()
-
-        self.downloadButton.setVisible(False)
-        self.progressBar.setVisible(True)
-        self.statusLabel.setText("Downloading model...")
-
-    def updateDownloadProgress(self, value):
-        self.progressBar.setValue(value)
-        self.update()
-
-    def onDownloadComplete(self, success, message):
-        self.progressBar.setVisible(False)
+        model_name = self.selectedModel()
+        if model_name is None:
+            return
+        self.download_manager.enqueue(model_name)
         self.downloadButton.setVisible(False)
 
+    def onDownloadComplete(self, model_name, success, message):
+        description = describe_model(model_name) or model_name
         if success:
-            model_key = self.modelCombo.currentText()
-            model_name = self.models[model_key]
-            self.model_downloads[model_name] = True
-            self.statusLabel.setText("Model downloaded successfully.")
+            self.refreshModelIndex()
+            self.statusLabel.setText(f"{description} downloaded successfully.")
         else:
-            self.statusLabel.setText(f"Download failed: {message}")
-        self.update()
+            self.statusLabel.setText(f"{description}: download failed: {message}")
+        self.onModelChange()
 
-    def loadModel(self):
+    def selectedModel(self):
         model_key = self.modelCombo.currentText()
-        model_name = self.models[model_key]
-        if self.current_model != model_name:
-            try:
-                self.current_model = model_name
-                model_path = self.find_model_path(model_name)
-                if model_path:
-                    self.tts = TTS(model_path=model_path)
-                else:
-                    self.tts = TTS(model_name=model_name)
-                self.showStatusMessage(f"Loaded model: {model_key}")
-            except Exception as e:
-                self.showErrorMessage("Model Loading Error", f"Failed to load model: {str(e)}")
-                self.current_model = None
-
-    def find_model_path(self, model_name):
-        for path in self.settings_manager.get_model_paths():
-            potential_path = os.path.join(path, model_name)
-            if os.path.exists(potential_path):
-                return potential_path
-        return None
+        return self.models.get(model_key)
+
+    # Called from the synthesis worker thread
+    def loadModel(self, model_name):
+        return self.model_cache.get_or_load(model_name, self.createModel)
+
+    # A model in the user's paths has to be found by the scan first
+    def createModel(self, model_name):
+        self.modelIndexScanner.wait()
+        return load_model(model_name, self.model_index)
+
+    def watchModelRoots(self):
+        if self.modelWatcher.directories():
+            self.modelWatcher.removePaths(self.modelWatcher.directories())
+        roots = [root for root, _ in self.model_index.roots() if os.path.isdir(root)]
+        if roots:
+            self.modelWatcher.addPaths(roots)
+
+    def refreshModelIndex(self):
+        if not self.modelIndexReady:
+            return
+        if self.model_index.refresh():
+            self.onModelChange()
 
     def previewModel(self):
-        self.loadModel()
-        if self.current_model:
-            preview_text = "This is a preview of the selected voice."
-            self.ttsToAudio(preview_text)
-
-    def ttsToAudio(self, text):
-        try:
-            output_file = "output.wav"
-            self.tts.tts_to_file(text=text, file_path=output_file)
-            audio = AudioSegment.from_file(output_file)
-            play(audio)
-        except Exception as e:
-            self.showErrorMessage("Error", f"An error occurred: {str(e)}")
+        preview_text = "This is a preview of the selected voice."
+        self.ttsToAudio(preview_text, incremental=False)
+
+    def ttsToAudio(self, text, incremental=True):
+        if self.selectedModel() is None:
+            self.showErrorMessage("Error", "Please select a voice first.")
+            return
+        self.synthesisWorker.submit(SynthesisJob.PLAY, self.selectedModel(), text,
+                                    words_per_minute=self.settings_manager.get_speech_rate(),
+                                    incremental=incremental)
 
     def playText(self):
-        self.loadModel()
-        if self.current_model:
-            text = self.textEdit.toPlainText().strip()
-            if not text:
-                self.showErrorMessage("Error", "Please enter some text to play.")
-                return
-            self.ttsToAudio(text)
+        text = self.textEdit.toPlainText().strip()
+        if not text:
+            self.showErrorMessage("Error", "Please enter some text to play.")
+            return
+        self.ttsToAudio(text)
 
     def saveAudio(self):
-        self.loadModel()
-        if self.current_model:
-            text = self.textEdit.toPlainText().strip()
-            if not text:
-                self.showErrorMessage("Error", "Please enter some text to save.")
-                return
-            
-            try:
-                save_path, _ = QFileDialog.getSaveFileName(self, "Save Audio", "", "Audio Files (*.wav)")
-                if save_path:
-                    self.tts.tts_to_file(text=text, file_path=save_path)
-                    self.showStatusMessage(f"Audio saved successfully to {save_path}")
-            except Exception as e:
-                self.showErrorMessage("Error", f"An error occurred: {str(e)}")
+        text = self.textEdit.toPlainText().strip()
+        if not text:
+            self.showErrorMessage("Error", "Please enter some text to save.")
+            return
+
+        if self.selectedModel() is None:
+            self.showErrorMessage("Error", "Please select a voice first.")
+            return
+
+        save_path, _ = QFileDialog.getSaveFileName(self, "Save Audio", "", "Audio Files (*.wav)")
+        if save_path:
+            self.synthesisWorker.submit(SynthesisJob.SAVE, self.selectedModel(), text, save_path,
+                                        self.settings_manager.get_speech_rate())
+
+    def cancelSynthesis(self):
+        self.synthesisWorker.cancelAll()
+        self.showStatusMessage("Canceling...")
+
+    def togglePlaybackPaused(self, paused):
+        if paused:
+            self.synthesisWorker.pausePlayback()
+            self.pausePlaybackButton.setText('Resume')
+        else:
+            self.synthesisWorker.resumePlayback()
+            self.pausePlaybackButton.setText('Pause')
+
+    def updateSynthesisProgress(self, event):
+        self.synthesisProgressBar.setValue(event.percent)
+        self.synthesisProgressBar.setFormat(f"%p%  {event.describe()}".strip())
+
+    def onSynthesisStatus(self, job_id, message):
+        self.showStatusMessage(message)
+
+    def onFirstAudio(self, job_id, latency):
+        self.showStatusMessage(f"Playing... (first audio after {latency:.2f}s)")
+
+    def onSynthesisQueueChanged(self, pending):
+        self.synthesisProgressBar.setVisible(pending > 0)
+        self.cancelSynthesisButton.setEnabled(pending > 0)
+        self.pausePlaybackButton.setEnabled(pending > 0)
+        if pending == 0:
+            self.pausePlaybackButton.setChecked(False)
+        if pending > 1:
+            self.cancelSynthesisButton.setText(f'Cancel ({pending} queued)')
+        else:
+            self.cancelSynthesisButton.setText('Cancel')
+
+    def onSynthesisComplete(self, job_id, success, message):
+        if success:
+            self.current_model = self.synthesisWorker.current_model
+            if message:
+                self.showStatusMessage(message)
+            else:
+                self.showStatusMessage("Done.")
+        elif message == "Canceled":
+            self.showStatusMessage("Synthesis canceled.")
+        else:
+            self.showErrorMessage("Error", f"An error occurred: {message}")
 
     def showErrorMessage(self, title, message):
         msg_box = QMessageBox()
@@ -223,4 +284,21 @@ class TTSApp(QWidget):
 
     def open_settings(self):
         settings_dialog = SettingsDialog(self.settings_manager, self)
-        settings_dialog.exec()
\ No newline at end of file
+        settings_dialog.exec()
+        if self.settings_manager.get_model_paths() != self.model_index.model_paths:
+            self.model_index.set_model_paths(self.settings_manager.get_model_paths())
+            self.watchModelRoots()
+            self.onModelChange()
+        self.model_cache.resize(self.settings_manager.get_model_cache_size(),
+                                self.settings_manager.get_model_cache_memory())
+        self.download_manager.setLimits(self.settings_manager.get_max_concurrent_downloads(),
+                                        self.settings_manager.get_bandwidth_limit())
+        self.synthesisWorker.setBatchSize(self.settings_manager.get_batch_size())
+
+    def closeEvent(self, event):
+        self.synthesisWorker.stop()
+        self.download_manager.cancelAll()
+        if hasattr(self, 'catalogRefresher'):
+            self.catalogRefresher.wait()
+        self.modelIndexScanner.wait()
+        super().closeEvent(event)
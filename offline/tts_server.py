@@ -0,0 +1,255 @@
+import argparse
+import asyncio
+import json
+import struct
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from aiohttp import web
+import shared_path
+from audio_cache import AudioCache
+from coqui_engine import CoquiEngine
+from model_cache import ModelCache
+from model_index import ModelIndex, load_model
+from settings_manager import SettingsManager
+from tracing import DEFAULT_TRACE_FILE, enable_profiling, span
+
+# Same range the app's settings allow; 0 keeps the voice's natural pace
+MAX_WORDS_PER_MINUTE = 300
+
+# Length fields of a WAV header whose size isn't known when streaming starts
+STREAMING_WAV_SIZE = 0xFFFFFFFF
+
+def streaming_wav_header(sample_rate):
+    return (b'RIFF' + struct.pack('<I', STREAMING_WAV_SIZE) + b'WAVE'
+            + b'fmt ' + struct.pack('<IHHIIHH', 16, 1, 1, sample_rate, sample_rate * 2, 2, 16)
+            + b'data' + struct.pack('<I', STREAMING_WAV_SIZE))
+
+class ServerMetrics:
+    def __init__(self, window=1000):
+        self.started_at = time.time()
+        self.requests = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.disconnected = 0
+        self.active = 0
+        self.characters = 0
+        self.audio_seconds = 0.0
+        self.synthesis_seconds = 0.0
+        self.first_chunk_latencies = deque(maxlen=window)
+        self.total_latencies = deque(maxlen=window)
+
+    def snapshot(self, queue_depth, max_queue, pending_inference, loaded_models):
+        return {
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'requests': self.requests,
+            'completed': self.completed,
+            'failed': self.failed,
+            'rejected': self.rejected,
+            'disconnected': self.disconnected,
+            'active': self.active,
+            'queue_depth': queue_depth,
+            'max_queue': max_queue,
+            'pending_inference': pending_inference,
+            'loaded_models': loaded_models,
+            'characters': self.characters,
+            'audio_seconds': round(self.audio_seconds, 2),
+            'chars_per_second': round(self.characters / self.synthesis_seconds, 1) if self.synthesis_seconds else 0.0,
+            'real_time_factor': round(self.synthesis_seconds / self.audio_seconds, 3) if self.audio_seconds else 0.0,
+            'first_chunk_latency_ms': percentiles(self.first_chunk_latencies),
+            'total_latency_ms': percentiles(self.total_latencies),
+        }
+
+def percentiles(values):
+    values = sorted(values)
+    if not values:
+        return {}
+    return {
+        'p50': round(1000 * values[len(values) // 2], 1),
+        'p95': round(1000 * values[int(len(values) * 0.95)], 1),
+        'max': round(1000 * values[-1], 1),
+    }
+
+# Serves one set of warm models to many clients. Inference runs on a single
+# thread (the models aren't thread-safe and one forward pass already uses every
+# core), fed sentence by sentence so concurrent requests interleave instead of
+# waiting for whole texts. Requests beyond max_queue get 503 straight away
+# rather than piling up behind the ones already admitted.
+class SynthesisServer:
+    def __init__(self, settings_manager, max_queue=16, batch_size=4, audio_cache=None):
+        self.settings_manager = settings_manager
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.audio_cache = audio_cache
+        self.model_index = ModelIndex(settings_manager.get_model_paths())
+        self.model_index.scan()
+        self.model_cache = ModelCache(settings_manager.get_model_cache_size(),
+                                      settings_manager.get_model_cache_memory())
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inference')
+        self.metrics = ServerMetrics()
+        self.queue_depth = 0
+        self.pending_inference = 0
+
+    def application(self):
+        app = web.Application()
+        app.router.add_post('/synthesize', self.handleSynthesize)
+        app.router.add_get('/models', self.handleModels)
+        app.router.add_get('/metrics', self.handleMetrics)
+        app.router.add_get('/health', self.handleHealth)
+        app.on_cleanup.append(self.cleanup)
+        return app
+
+    async def cleanup(self, app):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def loadModel(self, model_name):
+        return self.model_cache.get_or_load(model_name, lambda name: load_model(name, self.model_index))
+
+    async def preload(self, model_names):
+        loop = asyncio.get_running_loop()
+        for model_name in model_names:
+            started_at = time.perf_counter()
+            await loop.run_in_executor(self.executor, self.loadModel, model_name)
+            print(f"Loaded {model_name} in {time.perf_counter() - started_at:.1f}s")
+
+    # Looks the model up through the model cache on every call, so an
+    # engine never keeps an evicted model alive
+    def engine(self, model_name):
+        return CoquiEngine(model_name, load=self.loadModel, cache=self.audio_cache, batch_size=self.batch_size)
+
+    async def handleSynthesize(self, request):
+        try:
+            body = await request.json()
+        except json.JSONDecodeError:
+            raise web.HTTPBadRequest(text="Expected a JSON body")
+        if not isinstance(body, dict):
+            raise web.HTTPBadRequest(text="Expected a JSON object")
+        text = body.get('text')
+        if not isinstance(text, str) or not text.strip():
+            raise web.HTTPBadRequest(text="'text' is required")
+        text = text.strip()
+        model_name = body.get('model') or self.settings_manager.settings.get('server_default_model')
+        if not isinstance(model_name, str) or not model_name:
+            raise web.HTTPBadRequest(text="'model' is required")
+        words_per_minute = body.get('words_per_minute') or 0
+        if (not isinstance(words_per_minute, int) or isinstance(words_per_minute, bool)
+                or not 0 <= words_per_minute <= MAX_WORDS_PER_MINUTE):
+            raise web.HTTPBadRequest(text=f"'words_per_minute' must be a whole number from 0 to {MAX_WORDS_PER_MINUTE}")
+        if model_name not in self.model_cache and not self.model_index.is_installed(model_name):
+            raise web.HTTPNotFound(text=f"Model {model_name} is not installed")
+
+        self.metrics.requests += 1
+        if self.queue_depth >= self.max_queue:
+            self.metrics.rejected += 1
+            raise web.HTTPServiceUnavailable(text="Too many requests queued", headers={'Retry-After': '1'})
+
+        self.queue_depth += 1
+        try:
+            with span('server.request', model=model_name, chars=len(text)):
+                return await self.streamSpeech(request, model_name, text, words_per_minute)
+        finally:
+            self.queue_depth -= 1
+
+    async def streamSpeech(self, request, model_name, text, words_per_minute):
+        loop = asyncio.get_running_loop()
+        started_at = time.perf_counter()
+        synthesis_seconds = 0.0
+        audio_seconds = 0.0
+        response = None
+        engine = self.engine(model_name)
+        sentences = engine.split(text)
+        self.metrics.active += 1
+        try:
+            # The first sentence goes alone for a quick first chunk, then
+            # batches if the model renders them in one pass
+            size = await loop.run_in_executor(self.executor, engine.window_size)
+            windows = [sentences[:1]] + [sentences[start:start + size] for start in range(1, len(sentences), size)]
+            for window in windows:
+                if not window:
+                    continue
+                window_started_at = time.perf_counter()
+                self.pending_inference += 1
+                try:
+                    buffers = await loop.run_in_executor(self.executor, engine.render, window, words_per_minute)
+                finally:
+                    self.pending_inference -= 1
+                synthesis_seconds += time.perf_counter() - window_started_at
+                if response is None:
+                    response = web.StreamResponse(headers={'Content-Type': 'audio/wav'})
+                    response.enable_chunked_encoding()
+                    await response.prepare(request)
+                    await response.write(streaming_wav_header(buffers[0].sample_rate))
+                    self.metrics.first_chunk_latencies.append(time.perf_counter() - started_at)
+                for buffer in buffers:
+                    await response.write(buffer.to_pcm16())
+                    audio_seconds += buffer.duration
+            await response.write_eof()
+        except (ConnectionResetError, asyncio.CancelledError) as e:
+            # The client went away; stop synthesizing for it
+            self.metrics.disconnected += 1
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            return response
+        except Exception as e:
+            self.metrics.failed += 1
+            if response is None:
+                raise web.HTTPInternalServerError(text=f"Synthesis failed: {str(e)}")
+            raise
+        finally:
+            self.metrics.active -= 1
+        self.metrics.completed += 1
+        self.metrics.characters += len(text)
+        self.metrics.audio_seconds += audio_seconds
+        self.metrics.synthesis_seconds += synthesis_seconds
+        self.metrics.total_latencies.append(time.perf_counter() - started_at)
+        return response
+
+    async def handleModels(self, request):
+        return web.json_response({
+            'installed': self.model_index.installed_models(),
+            'loaded': self.model_cache.names(),
+        })
+
+    async def handleMetrics(self, request):
+        return web.json_response(self.metrics.snapshot(self.queue_depth, self.max_queue, self.pending_inference,
+                                                       self.model_cache.names()))
+
+    async def handleHealth(self, request):
+        return web.json_response({'status': 'ok'})
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve offline TTS models over HTTP.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('-m', '--preload', action='append', default=[],
+                        help="Model to load at start-up (repeatable); the first is the default model")
+    parser.add_argument('--max-queue', type=int, default=16,
+                        help="Requests admitted at once; more are rejected with 503")
+    parser.add_argument('-b', '--batch-size', type=int, default=4, help="Sentences per forward pass")
+    parser.add_argument('--no-cache', action='store_true', help="Don't use the sentence audio cache")
+    parser.add_argument('--profile', nargs='?', const=DEFAULT_TRACE_FILE, metavar='TRACE_FILE',
+                        help="Record per-stage timings and write a Chrome trace (default: %(const)s)")
+    args = parser.parse_args(argv)
+    if args.profile:
+        enable_profiling(args.profile)
+
+    settings_manager = SettingsManager()
+    if args.preload:
+        settings_manager.settings['server_default_model'] = args.preload[0]
+    audio_cache = None
+    if not args.no_cache:
+        audio_cache = AudioCache(settings_manager.get_audio_cache_dir(), settings_manager.get_audio_cache_size())
+    server = SynthesisServer(settings_manager, args.max_queue, args.batch_size, audio_cache)
+    app = server.application()
+
+    async def warm_up(app):
+        await server.preload(args.preload)
+    app.on_startup.append(warm_up)
+
+    web.run_app(app, host=args.host, port=args.port)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
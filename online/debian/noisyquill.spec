@@ -1,13 +1,21 @@
 # -*- mode: python ; coding: utf-8 -*-
 
+import os
+
 block_cipher = None
 
+# One copy of the app in online/ for every platform, plus the modules it
+# shares with the offline app; engines are imported by name, so gtts_engine
+# has to be listed
+ONLINE_DIR = os.path.join(SPECPATH, '..')
+SHARED_DIR = os.path.join(SPECPATH, '..', '..', 'shared')
+
 a = Analysis(
-    ['noisyquill.py'],
-    pathex=[],
+    [os.path.join(ONLINE_DIR, 'noisyquill.py')],
+    pathex=[ONLINE_DIR, SHARED_DIR],
     binaries=[],
     datas=[('feather_quill.ico', '.')],
-    hiddenimports=['gtts', 'playsound', 'tkinter'],
+    hiddenimports=['gtts', 'playsound', 'tkinter', 'numpy', 'requests', 'gtts_engine'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
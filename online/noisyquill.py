@@ -0,0 +1,400 @@
+import sys
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from playsound import playsound
+import os
+import tempfile
+import time
+import threading
+import traceback
+
+# Modules shared with the offline app live in ../shared; a frozen build has
+# them bundled instead
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+
+from chunk_cache import ChunkCache
+from chunked_tts import ChunkedSynthesizer, CANCEL_POLL_INTERVAL
+from fallback_engine import LocalSpeechEngine
+from incremental import IncrementalRenderer
+from progress_channel import ProgressChannel, ProgressTracker
+from synthesis_engine import SynthesisCanceled, create_engine
+from tracing import span
+
+# Streaming playback needs pydub (with ffmpeg) and sounddevice; without them
+# each chunk is played with playsound
+try:
+    from audio_output import default_sink
+    from streaming_player import StreamingPlayer
+except ImportError:
+    StreamingPlayer = None
+
+# Exact speech rates need the MP3s decoded and re-encoded; without pydub and
+# ffmpeg the rate falls back to gTTS's normal/slow switch
+def can_stretch():
+    if StreamingPlayer is None:
+        return False
+    try:
+        from pydub.utils import which
+    except ImportError:
+        return False
+    return bool(which('ffmpeg') or which('avconv'))
+
+# dls and libraries
+python_dir = os.path.join(os.path.dirname(sys.executable), '_internal')
+sys.path.append(python_dir)
+
+# set env var
+os.environ['PYTHONHOME'] = python_dir
+os.environ['PYTHONPATH'] = python_dir
+
+def log_environment():
+    with open("environment_log.txt", "w") as f:
+        f.write(f"Python version: {sys.version}\n")
+        f.write(f"Executable: {sys.executable}\n")
+        f.write(f"sys.path: {sys.path}\n")
+        f.write(f"PYTHONPATH: {os.environ.get('PYTHONPATH', 'Not set')}\n")
+        f.write(f"PYTHONHOME: {os.environ.get('PYTHONHOME', 'Not set')}\n")
+        f.write("Current working directory: " + os.getcwd() + "\n")
+        f.write("Contents of current directory:\n")
+        for item in os.listdir():
+            f.write(f"  {item}\n")
+
+try:
+    # initializing interpreter
+    log_environment()
+    import site # to add other needed modules
+except Exception as e:
+    error_message = f"Opps!! Failed to start embedded Python interpreter: {e}\n"
+    error_message += f"Python executable: {sys.executable}\n"
+    error_message += f"Python path: {sys.path}\n"
+    error_message += f"Traceback:\n{traceback.format_exc()}"
+    print(error_message)
+    with open("error_log.txt", "w") as f:
+        f.write(error_message)
+
+# Longest the UI waits for a canceled operation to wind down
+CANCEL_TIMEOUT = 0.5
+
+class VoiceToTextApp:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("Story Voicalizer")
+
+        # Text input
+        self.text_label = tk.Label(root, text="Enter your story:")
+        self.text_label.pack(pady=10)
+        self.text_entry = tk.Text(root, wrap='word', height=10, width=50)
+        self.text_entry.pack(pady=10)
+
+        # Enable standard shortcuts
+        self.text_entry.bind("<Control-a>", self.select_all)
+        self.text_entry.bind("<Control-c>", self.copy)
+        self.text_entry.bind("<Control-x>", self.cut)
+        self.text_entry.bind("<Control-v>", self.paste)
+
+        # Voice selection
+        self.voice_label = tk.Label(root, text="Select voice:")
+        self.voice_label.pack(pady=10)
+        self.voice_option = ttk.Combobox(root, values=["en", "en-au", "en-uk", "en-us"])
+        self.voice_option.set("en")
+        self.voice_option.pack(pady=10)
+
+        # Speech rate slider
+        self.rate_label = tk.Label(root, text="Speech rate (words per minute):")
+        self.rate_label.pack(pady=5)
+        self.rate_scale = ttk.Scale(root, from_=100, to=250, orient='horizontal', length=200)
+        self.rate_scale.set(175)  # Default value
+        self.rate_scale.pack(pady=5)
+        self.rate_value_label = tk.Label(root, text="175 WPM")
+        self.rate_value_label.pack(pady=5)
+        self.rate_scale.configure(command=self.update_rate_label)
+
+        # File name input
+        self.file_name_label = tk.Label(root, text="Enter file name (without extension):")
+        self.file_name_label.pack(pady=10)
+        self.file_name_entry = tk.Entry(root, width=30)
+        self.file_name_entry.pack(pady=10)
+
+        # Convert and play button
+        self.convert_play_button = tk.Button(root, text="Play", command=self.convert_and_play_threaded)
+        self.convert_play_button.pack(pady=10)
+
+        # Convert and save button
+        self.convert_save_button = tk.Button(root, text="Convert and Save", command=self.convert_and_save_threaded)
+        self.convert_save_button.pack(pady=10)
+
+        # Progress bar
+        self.progress_var = tk.DoubleVar()
+        self.progress = ttk.Progressbar(root, orient="horizontal", length=200, mode="determinate", variable=self.progress_var)
+        self.progress.pack(pady=10)
+        self.progress_label = tk.Label(root, text="0%")
+        self.progress_label.pack(pady=5)
+
+        # Add a cancel button
+        self.cancel_button = tk.Button(root, text="Cancel", command=self.cancel_operation, state=tk.DISABLED)
+        self.cancel_button.pack(pady=10)
+
+        # Pause only works when playback goes through the streaming output
+        self.pause_button = tk.Button(root, text="Pause", command=self.toggle_pause, state=tk.DISABLED)
+        self.pause_button.pack(pady=10)
+        self.player = None
+
+        self.current_thread = None
+        # Each operation gets an event of its own, so one that is still
+        # winding down after cancel can't be revived by the next one
+        self.cancel_event = threading.Event()
+        # Keeps its HTTP connections open across chunks, retries and clicks
+        # Repeated text is served from disk, and the offline voice stands in
+        # while the service is unreachable
+        self.synthesizer = ChunkedSynthesizer(cache=ChunkCache(), fallback=LocalSpeechEngine.create())
+        # The last story's audio, so after an edit only the changed sentences
+        # are fetched again: decoded for the streaming output, MP3 for
+        # playsound and saved files
+        self.renderer = IncrementalRenderer()
+        self.encoded_renderer = IncrementalRenderer(encoded=True)
+        # Conversion threads publish here; at most ten updates a second reach Tk
+        self.progress_channel = ProgressChannel(min_interval=0.1)
+        self.progress_channel.subscribe(lambda event: self.root.after(0, lambda: self.update_progress(event)))
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def select_all(self, event):
+        self.text_entry.tag_add(tk.SEL, "1.0", tk.END)
+        self.text_entry.mark_set(tk.INSERT, "1.0")
+        self.text_entry.see(tk.INSERT)
+        return 'break'
+
+    def copy(self, event):
+        if self.text_entry.tag_ranges(tk.SEL):
+            self.text_entry.event_generate("<<Copy>>")
+        return 'break'
+
+    def cut(self, event):
+        if self.text_entry.tag_ranges(tk.SEL):
+            self.text_entry.event_generate("<<Cut>>")
+        return 'break'
+
+    def paste(self, event):
+        self.text_entry.event_generate("<<Paste>>")
+        return 'break'
+
+    def update_rate_label(self, value):
+        wpm = int(float(value))
+        self.rate_value_label.config(text=f"{wpm} WPM")
+
+    def update_progress(self, event):
+        if self.cancel_button['state'] == tk.DISABLED:
+            return
+        self.progress_var.set(100 * event.fraction)
+        self.progress_label.config(text=f"{100 * event.fraction:.1f}%  {event.describe()}".strip())
+
+    def speech_settings(self):
+        text = self.text_entry.get("1.0", tk.END).strip()
+        if not text:
+            self.root.after(0, lambda: messagebox.showerror("Error", "Please enter a story to convert."))
+            return None
+
+        voice = self.voice_option.get()
+        words_per_minute = int(self.rate_scale.get())
+        if can_stretch():
+            # Fetched at normal speed and stretched to the exact rate
+            return text, voice, False, words_per_minute
+        return text, voice, words_per_minute <= 175, 0
+
+    # Engines are cheap views of the one synthesizer for a voice and speed
+    def engine(self, voice, slow):
+        return create_engine('gtts', lang=voice, slow=slow, synthesizer=self.synthesizer)
+
+    def incremental(self, voice, slow, encoded):
+        renderer = self.encoded_renderer if encoded else self.renderer
+        renderer.set_engine(self.engine(voice, slow))
+        return renderer
+
+    def convert_to_speech(self, cancel_event, save_path=None):
+        settings = self.speech_settings()
+        if not settings:
+            return None
+        text, voice, slow, words_per_minute = settings
+
+        temp_path = None
+        if not save_path:
+            with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as temp_file:
+                save_path = temp_path = temp_file.name
+
+        # The text is fetched in sentence-sized chunks in parallel; each chunk
+        # retries on its own, so one failure doesn't restart the whole story
+        progress = ProgressTracker(self.progress_channel)
+        try:
+            with span('job.save', chars=len(text)):
+                renderer = self.incremental(voice, slow, save_path.lower().endswith('.mp3'))
+                return renderer.save(text, save_path, words_per_minute, cancel_event, progress)
+        except Exception as e:
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+            if not isinstance(e, SynthesisCanceled):
+                self.root.after(0, lambda: messagebox.showerror("Error", f"Failed to convert text to speech. Error: {str(e)}"))
+            return None
+
+    def convert_and_play_threaded(self):
+        cancel_event = self.start_operation()
+        self.current_thread = threading.Thread(target=self.convert_and_play, args=(cancel_event,), daemon=True)
+        self.current_thread.start()
+
+    def convert_and_play(self, cancel_event):
+        settings = self.speech_settings()
+        if settings:
+            text, voice, slow, words_per_minute = settings
+            progress = ProgressTracker(self.progress_channel)
+            try:
+                # Each chunk is played as soon as it and the ones before it have
+                # arrived, and cancel is checked between and during chunks.
+                # Decoding and stretching run on the fetch workers.
+                sink = default_sink() if can_stretch() else None
+                with span('job.play', chars=len(text)):
+                    if sink:
+                        renderer = self.incremental(voice, slow, encoded=False)
+                        self.play_streaming(renderer.stream(text, words_per_minute, cancel_event, progress), sink,
+                                            cancel_event)
+                    else:
+                        renderer = self.incremental(voice, slow, encoded=True)
+                        suffix = '.' + renderer.engine.capabilities().encoded_format
+                        for data in renderer.stream(text, words_per_minute, cancel_event, progress):
+                            with span('disk.write', bytes=len(data)):
+                                with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+                                    temp_file.write(data)
+                            if not self.play_interruptible(temp_file.name, cancel_event):
+                                break
+            except SynthesisCanceled:
+                pass
+            except Exception as e:
+                self.root.after(0, lambda: messagebox.showerror("Error", f"Failed to play the story. Error: {str(e)}"))
+        self.root.after(0, lambda: self.end_operation(cancel_event))
+
+    # Decoded chunks go to the same streaming player as in the offline app,
+    # which starts playing with the first chunk and can be paused or stopped
+    # at any point; only the button and label updates are done here
+    def play_streaming(self, buffers, sink, cancel_event):
+        player = StreamingPlayer(
+            on_underrun=lambda count: self.root.after(
+                0, lambda: self.progress_label.config(text="Waiting for audio...")),
+            sink=sink)
+        player.start()
+        self.player = player
+        self.root.after(0, lambda: self.pause_button.config(state=tk.NORMAL))
+        try:
+            for buffer in buffers:
+                player.feed(buffer)
+            player.finish()
+            while player.is_alive():
+                if cancel_event.is_set():
+                    player.stop()
+                player.join(CANCEL_POLL_INTERVAL)
+            if player.error:
+                raise player.error
+        finally:
+            self.player = None
+            player.stop()
+            player.join()
+
+    def toggle_pause(self):
+        player = self.player
+        if not player:
+            return
+        if player.paused:
+            player.resume()
+            self.pause_button.config(text="Pause")
+        else:
+            player.pause()
+            self.pause_button.config(text="Resume")
+
+    # playsound can't be stopped once it has started, so it runs on a thread of
+    # its own and the caller stops waiting for it as soon as cancel is pressed.
+    # Returns False when canceled.
+    def play_interruptible(self, path, cancel_event):
+        errors = []
+
+        def play():
+            try:
+                playsound(path)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                os.remove(path)
+
+        player = threading.Thread(target=play, daemon=True)
+        player.start()
+        with span('playback'):
+            while player.is_alive():
+                if cancel_event.wait(CANCEL_POLL_INTERVAL):
+                    return False
+        if errors:
+            raise errors[0]
+        return True
+
+    def convert_and_save_threaded(self):
+        cancel_event = self.start_operation()
+        self.current_thread = threading.Thread(target=self.convert_and_save, args=(cancel_event,), daemon=True)
+        self.current_thread.start()
+
+    def convert_and_save(self, cancel_event):
+        file_name = self.file_name_entry.get().strip()
+        if not file_name:
+            self.root.after(0, lambda: messagebox.showerror("Error", "Please enter a file name."))
+            self.root.after(0, lambda: self.end_operation(cancel_event))
+            return
+
+        file_name += ".mp3"
+        save_path = filedialog.asksaveasfilename(defaultextension=".mp3",
+                                                 filetypes=[("MP3 files", "*.mp3")],
+                                                 initialfile=file_name)
+        if save_path and not cancel_event.is_set():
+            saved_file = self.convert_to_speech(cancel_event, save_path)
+            if saved_file:
+                self.root.after(0, lambda: messagebox.showinfo("Success", f"File saved successfully as:\n{saved_file}"))
+        self.root.after(0, lambda: self.end_operation(cancel_event))
+
+    # Returns the new operation's cancel event, for its worker thread
+    def start_operation(self):
+        self.progress_var.set(0)
+        self.cancel_event = threading.Event()
+        self.convert_play_button.config(state=tk.DISABLED)
+        self.convert_save_button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        return self.cancel_event
+
+    # A worker that outlived its cancel timeout finishes after the next
+    # operation has started; that one's buttons are left alone
+    def end_operation(self, cancel_event):
+        if cancel_event is not self.cancel_event:
+            return
+        self.convert_play_button.config(state=tk.NORMAL)
+        self.convert_save_button.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.DISABLED)
+        self.pause_button.config(state=tk.DISABLED, text="Pause")
+        self.progress_var.set(0)
+        self.progress_label.config(text="0%")
+
+    def cancel_operation(self):
+        self.cancel_event.set()
+        self.cancel_button.config(state=tk.DISABLED)
+        self.wait_for_cancel(self.cancel_event, time.perf_counter())
+
+    # Conversion and playback check the event every CANCEL_POLL_INTERVAL. This
+    # polls for the worker to wind down instead of joining it, which would
+    # block the Tk main loop that the worker's callbacks need.
+    def wait_for_cancel(self, cancel_event, canceled_at):
+        elapsed = time.perf_counter() - canceled_at
+        running = self.current_thread and self.current_thread.is_alive()
+        if running and elapsed < CANCEL_TIMEOUT:
+            self.root.after(int(1000 * CANCEL_POLL_INTERVAL), lambda: self.wait_for_cancel(cancel_event, canceled_at))
+            return
+        self.end_operation(cancel_event)
+
+    def on_close(self):
+        self.cancel_event.set()
+        self.synthesizer.close()
+        self.root.destroy()
+
+if __name__ == "__main__":
+    root = tk.Tk()
+    app = VoiceToTextApp(root)
+    root.mainloop()
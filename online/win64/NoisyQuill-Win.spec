@@ -1,13 +1,20 @@
 # -*- mode: python ; coding: utf-8 -*-
 
+import os
+
 block_cipher = None
 
+# Same app source as the Debian build: online/noisyquill.py plus ../shared;
+# engines are imported by name, so gtts_engine has to be listed
+ONLINE_DIR = os.path.join(SPECPATH, '..')
+SHARED_DIR = os.path.join(SPECPATH, '..', '..', 'shared')
+
 a = Analysis(
-    ['voice_to_text_app.py'],
-    pathex=['C:\\Users\\user\\Desktop\\Python_Projects\\text-to-speech_app\\online'],
+    [os.path.join(ONLINE_DIR, 'noisyquill.py')],
+    pathex=[ONLINE_DIR, SHARED_DIR],
     binaries=[],
     datas=[],
-    hiddenimports=[],
+    hiddenimports=['gtts', 'playsound', 'tkinter', 'numpy', 'requests', 'gtts_engine'],
     hookspath=[],
     runtime_hooks=[],
     excludes=[],
@@ -0,0 +1,66 @@
+import io
+import os
+import wave
+import numpy as np
+from lazy_imports import pydub
+from tracing import span
+
+# Mono float samples straight out of the model, kept in memory until they are
+# played or encoded
+class AudioBuffer:
+    def __init__(self, samples, sample_rate):
+        self.samples = np.asarray(samples, dtype=np.float32)
+        self.sample_rate = sample_rate
+
+    @classmethod
+    def from_wav(cls, file):
+        with wave.open(file, 'rb') as wav_file:
+            sample_rate = wav_file.getframerate()
+            frames = wav_file.readframes(wav_file.getnframes())
+        samples = np.frombuffer(frames, dtype='<i2').astype(np.float32) / 32767
+        return cls(samples, sample_rate)
+
+    @classmethod
+    def concatenate(cls, buffers, sample_rate=None):
+        if not buffers:
+            return cls(np.zeros(0, dtype=np.float32), sample_rate or 22050)
+        return cls(np.concatenate([buffer.samples for buffer in buffers]), buffers[0].sample_rate)
+
+    @property
+    def duration(self):
+        return len(self.samples) / self.sample_rate
+
+    @property
+    def nbytes(self):
+        return self.samples.nbytes
+
+    def to_pcm16(self):
+        return (np.clip(self.samples, -1.0, 1.0) * 32767).astype('<i2').tobytes()
+
+    def to_segment(self):
+        return pydub.AudioSegment(data=self.to_pcm16(), sample_width=2, frame_rate=self.sample_rate, channels=1)
+
+    def to_wav_bytes(self):
+        output = io.BytesIO()
+        self.write_wav(output)
+        return output.getvalue()
+
+    def write_wav(self, file):
+        with wave.open(file, 'wb') as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(self.sample_rate)
+            wav_file.writeframes(self.to_pcm16())
+
+    def save(self, path):
+        extension = os.path.splitext(path)[1].lower().lstrip('.')
+        with span('encode.save', format=extension or 'wav', seconds=round(self.duration, 2)):
+            if extension in ('', 'wav'):
+                self.write_wav(path)
+            else:
+                self.to_segment().export(path, format=extension)
+
+def synthesize(tts, text):
+    with span('inference', chars=len(text)):
+        samples = tts.tts(text=text)
+    return AudioBuffer(samples, tts.synthesizer.output_sample_rate)
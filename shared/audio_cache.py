@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import threading
+import wave
+from collections import OrderedDict
+from audio_buffer import AudioBuffer
+from tracing import span
+
+def normalize_text(text):
+    return ' '.join(text.split())
+
+def cache_key(model_name, text, params=None):
+    key_data = json.dumps([model_name, normalize_text(text), params or {}], sort_keys=True)
+    return hashlib.sha256(key_data.encode('utf-8')).hexdigest()
+
+# Synthesized audio keyed by (model, text, params). Recent entries stay in
+# memory, everything is also written to disk as WAV; both tiers evict the
+# least recently used entries once over their size budget.
+class AudioCache:
+    def __init__(self, cache_dir, max_disk_mb=500, max_memory_mb=64):
+        self.cache_dir = cache_dir
+        self.max_disk = max_disk_mb * 1024 * 1024
+        self.max_memory = max_memory_mb * 1024 * 1024
+        self.memory = OrderedDict()
+        self.memory_size = 0
+        self.disk = OrderedDict()
+        self.disk_size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._scan_disk()
+
+    def _scan_disk(self):
+        entries = []
+        for file_name in os.listdir(self.cache_dir):
+            if not file_name.endswith('.wav'):
+                continue
+            stat = os.stat(os.path.join(self.cache_dir, file_name))
+            entries.append((stat.st_mtime, file_name[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self.disk[key] = size
+            self.disk_size += size
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + '.wav')
+
+    def get(self, model_name, text, params=None):
+        key = cache_key(model_name, text, params)
+        with self.lock:
+            buffer = self.memory.get(key)
+            if buffer is not None:
+                self.memory.move_to_end(key)
+                self.hits += 1
+                return buffer
+            on_disk = key in self.disk
+        if not on_disk:
+            with self.lock:
+                self.misses += 1
+            return None
+        try:
+            with span('disk.read', cache='audio'):
+                buffer = AudioBuffer.from_wav(self._path(key))
+                os.utime(self._path(key))
+        except (OSError, EOFError, wave.Error) as e:
+            print(f"Dropping unreadable cache entry {key}: {str(e)}")
+            with self.lock:
+                self._remove_from_disk(key)
+                self.misses += 1
+            return None
+        with self.lock:
+            self.disk.move_to_end(key)
+            self._remember(key, buffer)
+            self.hits += 1
+        return buffer
+
+    def put(self, model_name, text, buffer, params=None):
+        key = cache_key(model_name, text, params)
+        path = self._path(key)
+        temp_path = path + '.tmp'
+        with span('disk.write', cache='audio'):
+            buffer.write_wav(temp_path)
+            os.replace(temp_path, path)
+        with self.lock:
+            if key in self.disk:
+                self.disk_size -= self.disk[key]
+            self.disk[key] = os.path.getsize(path)
+            self.disk_size += self.disk[key]
+            self.disk.move_to_end(key)
+            self._remember(key, buffer)
+            while self.disk_size > self.max_disk and len(self.disk) > 1:
+                self._remove_from_disk(next(iter(self.disk)))
+
+    def get_or_synthesize(self, model_name, text, synthesize, params=None):
+        buffer = self.get(model_name, text, params)
+        if buffer is None:
+            buffer = synthesize(text)
+            self.put(model_name, text, buffer, params)
+        return buffer
+
+    def clear(self):
+        with self.lock:
+            for key in list(self.disk):
+                self._remove_from_disk(key)
+            self.memory.clear()
+            self.memory_size = 0
+
+    def _remember(self, key, buffer):
+        if key in self.memory:
+            self.memory_size -= self.memory[key].nbytes
+        self.memory[key] = buffer
+        self.memory.move_to_end(key)
+        self.memory_size += buffer.nbytes
+        while self.memory_size > self.max_memory and len(self.memory) > 1:
+            _, evicted = self.memory.popitem(last=False)
+            self.memory_size -= evicted.nbytes
+
+    def _remove_from_disk(self, key):
+        self.disk_size -= self.disk.pop(key, 0)
+        buffer = self.memory.pop(key, None)
+        if buffer is not None:
+            self.memory_size -= buffer.nbytes
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
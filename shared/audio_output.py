@@ -0,0 +1,298 @@
+import io
+import threading
+import time
+import wave
+import numpy as np
+from tracing import traced
+
+# Fixed-size circular buffer of mono float32 samples. Not thread-safe on its
+# own; AudioOutput guards it with its condition.
+class RingBuffer:
+    def __init__(self, capacity):
+        self.data = np.zeros(capacity, dtype=np.float32)
+        self.capacity = capacity
+        self.start = 0
+        self.available = 0
+
+    @property
+    def space(self):
+        return self.capacity - self.available
+
+    def write(self, samples):
+        count = min(len(samples), self.space)
+        end = (self.start + self.available) % self.capacity
+        first = min(count, self.capacity - end)
+        self.data[end:end + first] = samples[:first]
+        self.data[:count - first] = samples[first:count]
+        self.available += count
+        return count
+
+    def read(self, count):
+        count = min(count, self.available)
+        first = min(count, self.capacity - self.start)
+        block = np.concatenate([self.data[self.start:self.start + first], self.data[:count - first]])
+        self.start = (self.start + count) % self.capacity
+        self.available -= count
+        return block
+
+    def clear(self):
+        self.start = 0
+        self.available = 0
+
+# Discards audio; with realtime=True it takes as long as a sound card would,
+# which makes pause, seek and underruns observable without one
+class NullSink:
+    def __init__(self, realtime=False):
+        self.realtime = realtime
+        self.sample_rate = None
+        self.frames = 0
+
+    def open(self, sample_rate):
+        self.sample_rate = sample_rate
+
+    def write(self, block):
+        self.frames += len(block)
+        if self.realtime:
+            time.sleep(len(block) / self.sample_rate)
+
+    def close(self):
+        pass
+
+class WavFileSink:
+    realtime = False
+
+    def __init__(self, path):
+        self.path = path
+        self.wav_file = None
+
+    def open(self, sample_rate):
+        self.wav_file = wave.open(self.path, 'wb')
+        self.wav_file.setnchannels(1)
+        self.wav_file.setsampwidth(2)
+        self.wav_file.setframerate(sample_rate)
+
+    def write(self, block):
+        self.wav_file.writeframes((np.clip(block, -1.0, 1.0) * 32767).astype('<i2').tobytes())
+
+    def close(self):
+        if self.wav_file:
+            self.wav_file.close()
+            self.wav_file = None
+
+class SoundDeviceSink:
+    realtime = True
+
+    def __init__(self):
+        self.stream = None
+
+    def open(self, sample_rate):
+        import sounddevice
+        self.stream = sounddevice.OutputStream(samplerate=sample_rate, channels=1, dtype='float32')
+        self.stream.start()
+
+    def write(self, block):
+        self.stream.write(block.reshape(-1, 1))
+
+    def close(self):
+        if self.stream:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+
+# The sound card sink, or None when sounddevice isn't installed and callers
+# have to fall back to their old playback path
+def default_sink():
+    try:
+        import sounddevice
+        sounddevice.query_devices(kind='output')
+    except Exception:
+        return None
+    return SoundDeviceSink()
+
+# gTTS hands back MP3; decoding it needs pydub (and ffmpeg)
+@traced('encode.decode')
+def decode_mp3(data):
+    from pydub import AudioSegment
+    segment = AudioSegment.from_file(io.BytesIO(data), format='mp3').set_channels(1).set_sample_width(2)
+    return np.frombuffer(segment.raw_data, dtype='<i2').astype(np.float32) / 32767, segment.frame_rate
+
+@traced('encode.mp3')
+def encode_mp3(samples, sample_rate, bitrate='32k'):
+    from pydub import AudioSegment
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype('<i2').tobytes()
+    output = io.BytesIO()
+    AudioSegment(data=pcm, sample_width=2, frame_rate=sample_rate, channels=1).export(
+        output, format='mp3', bitrate=bitrate)
+    return output.getvalue()
+
+# Plays audio while it is still being produced. Everything fed in is kept so
+# playback can seek back; a feeder thread copies it from the current position
+# into a small ring buffer, and an output thread drains the ring buffer into
+# the sink block by block. An underrun is counted when the sink is ready for
+# more but the producer hasn't supplied it yet.
+class AudioOutput:
+    def __init__(self, sink, block_frames=1024, buffer_seconds=0.5, on_first_audio=None, on_underrun=None):
+        self.sink = sink
+        self.block_frames = block_frames
+        self.buffer_seconds = buffer_seconds
+        self.on_first_audio = on_first_audio
+        self.on_underrun = on_underrun
+        self.condition = threading.Condition()
+        self.sample_rate = None
+        self.ring = None
+        self.chunks = []
+        self.chunk_starts = []
+        self.fed_frames = 0
+        self.cursor = 0
+        self.position_frames = 0
+        self.finished = False
+        self.paused = False
+        self.stopped = False
+        self.done = False
+        self.started = False
+        self.starving = False
+        self.underruns = 0
+        self.first_audio_at = None
+        self.error = None
+        self.threads = []
+
+    def feed(self, samples, sample_rate):
+        samples = np.asarray(samples, dtype=np.float32)
+        with self.condition:
+            if self.sample_rate is None:
+                self.sample_rate = sample_rate
+                self.ring = RingBuffer(max(self.block_frames * 2, int(sample_rate * self.buffer_seconds)))
+                self.sink.open(sample_rate)
+                self.start_threads()
+            elif sample_rate != self.sample_rate:
+                raise ValueError(f"Sample rate changed from {self.sample_rate} to {sample_rate}")
+            self.chunk_starts.append(self.fed_frames)
+            self.chunks.append(samples)
+            self.fed_frames += len(samples)
+            self.condition.notify_all()
+
+    def finish(self):
+        with self.condition:
+            self.finished = True
+            if self.sample_rate is None:
+                self.done = True
+            self.condition.notify_all()
+
+    def pause(self):
+        with self.condition:
+            self.paused = True
+            self.condition.notify_all()
+
+    def resume(self):
+        with self.condition:
+            self.paused = False
+            self.condition.notify_all()
+
+    def seek(self, seconds):
+        with self.condition:
+            if self.sample_rate is None:
+                return
+            frame = int(max(0.0, seconds) * self.sample_rate)
+            self.cursor = self.position_frames = min(frame, self.fed_frames)
+            self.ring.clear()
+            self.done = False
+            self.condition.notify_all()
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+        for thread in self.threads:
+            if thread is not threading.current_thread():
+                thread.join()
+        self.sink.close()
+
+    # True once everything fed in has been played (or playback was stopped)
+    def wait(self, timeout=None):
+        with self.condition:
+            return self.condition.wait_for(lambda: self.done or self.stopped, timeout)
+
+    @property
+    def position(self):
+        return self.position_frames / self.sample_rate if self.sample_rate else 0.0
+
+    @property
+    def duration(self):
+        return self.fed_frames / self.sample_rate if self.sample_rate else 0.0
+
+    def start_threads(self):
+        self.threads = [threading.Thread(target=self.fill, daemon=True),
+                        threading.Thread(target=self.play, daemon=True)]
+        for thread in self.threads:
+            thread.start()
+
+    def samples_at(self, start, count):
+        index = np.searchsorted(self.chunk_starts, start, side='right') - 1
+        pieces = []
+        while count > 0 and index < len(self.chunks):
+            offset = start - self.chunk_starts[index]
+            piece = self.chunks[index][offset:offset + count]
+            pieces.append(piece)
+            start += len(piece)
+            count -= len(piece)
+            index += 1
+        return np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32)
+
+    def fill(self):
+        with self.condition:
+            while not self.stopped:
+                if self.cursor < self.fed_frames and self.ring.space:
+                    self.cursor += self.ring.write(self.samples_at(self.cursor, self.ring.space))
+                    self.condition.notify_all()
+                else:
+                    self.condition.wait()
+
+    def next_block(self):
+        with self.condition:
+            while not self.stopped:
+                if self.paused:
+                    self.condition.wait()
+                    continue
+                exhausted = self.cursor >= self.fed_frames
+                if self.ring.available >= self.block_frames or (self.ring.available and exhausted and self.finished):
+                    self.starving = False
+                    block = self.ring.read(self.block_frames)
+                    # Wake the feeder to top the ring buffer back up
+                    self.condition.notify_all()
+                    return block, False
+                if exhausted and self.finished:
+                    if not self.done:
+                        self.done = True
+                        self.condition.notify_all()
+                    self.condition.wait()
+                    continue
+                if exhausted and self.started and not self.starving:
+                    self.starving = True
+                    self.underruns += 1
+                    return None, True
+                self.condition.wait(0.05)
+            return None, False
+
+    def play(self):
+        try:
+            while True:
+                block, underrun = self.next_block()
+                if underrun:
+                    if self.on_underrun:
+                        self.on_underrun(self.underruns)
+                    continue
+                if block is None:
+                    break
+                if not self.started:
+                    self.started = True
+                    self.first_audio_at = time.perf_counter()
+                    if self.on_first_audio:
+                        self.on_first_audio(self.first_audio_at)
+                self.sink.write(block)
+                with self.condition:
+                    self.position_frames += len(block)
+        except Exception as e:
+            self.error = e
+            with self.condition:
+                self.stopped = True
+                self.condition.notify_all()
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+import threading
+from tracing import span
+
+def default_cache_dir():
+    return os.path.join(os.path.expanduser('~'), '.cache', 'noisyquill', 'gtts')
+
+def cache_key(lang, slow, text):
+    normalized = ' '.join(text.split())
+    return hashlib.sha256(json.dumps([lang, bool(slow), normalized]).encode('utf-8')).hexdigest()
+
+# MP3 chunks fetched from the TTS service, one file per (lang, slow, text).
+# The least recently used files are deleted once the cache grows past
+# max_disk_mb; a hit touches the file so its mtime tracks last use.
+class ChunkCache:
+    def __init__(self, cache_dir=None, max_disk_mb=200):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_disk_mb * 1024 * 1024
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.scan()
+        with self.lock:
+            self.evict()
+
+    def scan(self):
+        found = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.mp3'):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                found.append((stat.st_mtime, name[:-4], stat.st_size))
+        # Oldest first, so dict order doubles as LRU order
+        for _, key, size in sorted(found):
+            self.entries[key] = size
+            self.size += size
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.mp3")
+
+    def get(self, lang, slow, text):
+        key = cache_key(lang, slow, text)
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.entries[key] = self.entries.pop(key)
+            self.hits += 1
+        try:
+            with span('disk.read', cache='gtts'), open(self.path(key), 'rb') as f:
+                data = f.read()
+            os.utime(self.path(key))
+            return data
+        except OSError:
+            with self.lock:
+                self.size -= self.entries.pop(key, 0)
+            return None
+
+    def put(self, lang, slow, text, data):
+        key = cache_key(lang, slow, text)
+        temp_path = f"{self.path(key)}.{threading.get_ident()}.tmp"
+        with span('disk.write', cache='gtts'):
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, self.path(key))
+        with self.lock:
+            self.size -= self.entries.pop(key, 0)
+            self.entries[key] = len(data)
+            self.size += len(data)
+            self.evict()
+
+    def evict(self):
+        while self.size > self.max_bytes and len(self.entries) > 1:
+            key = next(iter(self.entries))
+            self.size -= self.entries.pop(key)
+            try:
+                os.remove(self.path(key))
+            except OSError:
+                pass
+
+    def clear(self):
+        with self.lock:
+            for key in list(self.entries):
+                try:
+                    os.remove(self.path(key))
+                except OSError:
+                    pass
+            self.entries.clear()
+            self.size = 0
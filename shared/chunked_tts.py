@@ -0,0 +1,281 @@
+import base64
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+import requests
+from requests.adapters import HTTPAdapter
+from gtts import gTTS
+from tracing import span, traced
+
+# gTTS sends at most this many characters per request, so chunks of this size
+# map to exactly one request each
+MAX_CHUNK_CHARS = 100
+
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+|(?<=[.!?]["\')\]])\s+|\n\s*\n')
+AUDIO_PATTERN = re.compile(r'jQ1olc","\[\\"(.*)\\"]')
+
+# gTTS returns 24 kHz mono MP3 at 32 kbit/s, which gives the audio length of a chunk
+GTTS_BITRATE = 32000
+
+# How often a wait on a chunk checks for cancellation
+CANCEL_POLL_INTERVAL = 0.05
+
+# Set to a local stand-in server to exercise the online path without the real service
+ENDPOINT_ENV = 'NOISYQUILL_TTS_URL'
+DEFAULT_ENDPOINT = 'https://translate.google.com/_/TranslateWebserverUi/data/batchexecute'
+
+class ConversionCanceled(Exception):
+    pass
+
+class ChunkFailedError(Exception):
+    def __init__(self, index, total, cause):
+        super().__init__(f"Chunk {index + 1} of {total} failed: {cause}")
+        self.index = index
+        self.cause = cause
+
+def _split_long(sentence, max_chars):
+    parts = []
+    while len(sentence) > max_chars:
+        cut = max(sentence.rfind(separator, 0, max_chars) for separator in (', ', '; ', ' '))
+        if cut <= 0:
+            cut = max_chars
+        parts.append(sentence[:cut + 1].strip())
+        sentence = sentence[cut + 1:].strip()
+    if sentence:
+        parts.append(sentence)
+    return parts
+
+# Packs whole sentences into chunks of at most max_chars; only sentences longer
+# than that are broken, at a comma, semicolon or space
+@traced('text.normalize')
+def split_chunks(text, max_chars=MAX_CHUNK_CHARS):
+    chunks = []
+    current = ''
+    for sentence in SENTENCE_END.split(text):
+        sentence = ' '.join(sentence.split())
+        if not sentence:
+            continue
+        if current and len(current) + 1 + len(sentence) <= max_chars:
+            current += ' ' + sentence
+            continue
+        if current:
+            chunks.append(current)
+        current = ''
+        parts = _split_long(sentence, max_chars)
+        chunks.extend(parts[:-1])
+        current = parts[-1] if parts else ''
+    if current:
+        chunks.append(current)
+    return chunks
+
+class RequestMetrics:
+    def __init__(self, window=500):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        self.latencies = deque(maxlen=window)
+
+    def record(self, seconds, success):
+        with self.lock:
+            self.requests += 1
+            if not success:
+                self.failures += 1
+            self.latencies.append(seconds)
+
+    def latency_summary(self):
+        with self.lock:
+            latencies = sorted(self.latencies)
+        if not latencies:
+            return {}
+        return {
+            'mean_ms': round(1000 * sum(latencies) / len(latencies), 1),
+            'p50_ms': round(1000 * latencies[len(latencies) // 2], 1),
+            'p95_ms': round(1000 * latencies[int(len(latencies) * 0.95)], 1),
+            'max_ms': round(1000 * latencies[-1], 1),
+        }
+
+# Talks to the Google Translate TTS endpoint the same way gTTS does, but lets
+# the caller choose the endpoint and returns the MP3 bytes of one chunk.
+# gTTS opens a new session (and TLS connection) per request; this client keeps
+# one keep-alive session whose pool is shared by all chunks, retries and
+# conversions for as long as the client lives.
+class GTTSClient:
+    def __init__(self, endpoint=None, timeout=15, pool_size=4):
+        self.endpoint = endpoint or os.environ.get(ENDPOINT_ENV) or DEFAULT_ENDPOINT
+        self.timeout = timeout
+        self.metrics = RequestMetrics()
+        self.session = requests.Session()
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=False)
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+        self.session.headers.update(gTTS.GOOGLE_TTS_HEADERS)
+
+    def connections_opened(self):
+        pools = self.adapter.poolmanager.pools
+        return sum(pools[key].num_connections for key in pools.keys())
+
+    def stats(self):
+        requests_sent = self.metrics.requests
+        opened = self.connections_opened()
+        return {
+            'requests': requests_sent,
+            'failures': self.metrics.failures,
+            'connections_opened': opened,
+            # Requests that went out on an already open connection
+            'connections_reused': max(0, requests_sent - opened),
+            'latency': self.metrics.latency_summary(),
+        }
+
+    def close(self):
+        self.session.close()
+
+    def fetch(self, text, lang='en', slow=False):
+        audio = bytearray()
+        for body in gTTS(text=text, lang=lang, slow=slow).get_bodies():
+            started_at = time.perf_counter()
+            try:
+                with span('network.fetch', chars=len(text)):
+                    response = self.session.post(self.endpoint, data=body, timeout=self.timeout)
+                    response.raise_for_status()
+            except Exception:
+                self.metrics.record(time.perf_counter() - started_at, False)
+                raise
+            self.metrics.record(time.perf_counter() - started_at, True)
+            match = AUDIO_PATTERN.search(response.text)
+            if not match:
+                raise ValueError("No audio in the TTS response")
+            audio += base64.b64decode(match.group(1))
+        return bytes(audio)
+
+# Network failures, timeouts, rate limiting and server errors, as opposed to a
+# request the service rejects (such as an unsupported language)
+def service_unavailable(error):
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return False
+
+# Fetches the chunks of a long text concurrently and writes the MP3s out in
+# order. MP3 frames are self-contained, so the chunks can simply be appended.
+# A failed chunk is retried with exponential backoff on its own instead of
+# restarting the whole text.
+class ChunkedSynthesizer:
+    def __init__(self, client=None, workers=4, retries=3, backoff=0.5, max_chars=MAX_CHUNK_CHARS,
+                 cache=None, fallback=None, outage_cooldown=60):
+        self.client = client or GTTSClient(pool_size=workers)
+        self.workers = max(1, workers)
+        self.retries = max(1, retries)
+        self.backoff = backoff
+        self.max_chars = max_chars
+        self.cache = cache
+        self.fallback = fallback
+        self.outage_cooldown = outage_cooldown
+        self.service_down_until = 0.0
+
+    def close(self):
+        self.client.close()
+        if self.fallback:
+            self.fallback.close()
+
+    # Cached chunks never touch the network. While the service is known to be
+    # down, chunks go straight to the fallback engine instead of waiting
+    # through retries; fallback audio isn't cached so the real voice is
+    # fetched once the service is back.
+    def fetch_chunk(self, chunk, lang, slow, cancel_event, abort):
+        if self.cache:
+            data = self.cache.get(lang, slow, chunk)
+            if data is not None:
+                return data
+        if self.fallback and time.monotonic() < self.service_down_until:
+            return self.fallback.synthesize(chunk, lang, slow)
+        for attempt in range(self.retries):
+            if cancel_event.is_set() or abort.is_set():
+                raise ConversionCanceled()
+            try:
+                data = self.client.fetch(chunk, lang, slow)
+                if self.cache:
+                    self.cache.put(lang, slow, chunk, data)
+                return data
+            except Exception as e:
+                if attempt == self.retries - 1:
+                    if self.fallback and service_unavailable(e):
+                        if time.monotonic() >= self.service_down_until:
+                            print(f"TTS service unavailable, using the offline voice: {str(e)}")
+                        self.service_down_until = time.monotonic() + self.outage_cooldown
+                        return self.fallback.synthesize(chunk, lang, slow)
+                    raise
+                # Sleep, but wake up straight away on cancel
+                if cancel_event.wait(self.backoff * 2 ** attempt):
+                    raise ConversionCanceled()
+
+    # Runs on the pool: fetch, count, then the caller's transform (decoding,
+    # time-stretching) so that work is spread over the workers too
+    def produce_chunk(self, chunk, lang, slow, cancel_event, abort, progress, transform):
+        data = self.fetch_chunk(chunk, lang, slow, cancel_event, abort)
+        if progress:
+            # Counted as chunks arrive, which may be out of order
+            progress.advance(1, len(data), len(data) * 8 / GTTS_BITRATE)
+        return transform(chunk, data) if transform else data
+
+    # Yields the MP3 bytes of each chunk in text order while later chunks are
+    # still being fetched. Waiting is done in short slices so a cancel is
+    # noticed within CANCEL_POLL_INTERVAL even when a request is stuck; the
+    # abandoned request finishes in the background and is discarded.
+    def iter_chunks(self, text, lang='en', slow=False, cancel_event=None, progress=None, transform=None):
+        chunks = split_chunks(text, self.max_chars)
+        if not chunks:
+            raise ValueError("No text to convert")
+        if progress:
+            progress.set_total(len(chunks), 'chunks', "Converting...")
+        yield from self.iter_segments(chunks, lang, slow, cancel_event, progress, transform)
+        if progress:
+            progress.finish()
+
+    # The same for text that is already split into chunks of at most max_chars.
+    # progress is advanced per chunk; its total is left to the caller, which
+    # may fetch a text's chunks over several calls.
+    def iter_segments(self, chunks, lang='en', slow=False, cancel_event=None, progress=None, transform=None):
+        cancel_event = cancel_event or threading.Event()
+        # Stops the other chunks once one has failed for good
+        abort = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=min(self.workers, len(chunks)))
+        try:
+            futures = [executor.submit(self.produce_chunk, chunk, lang, slow, cancel_event, abort,
+                                       progress, transform)
+                       for chunk in chunks]
+            for index, future in enumerate(futures):
+                while True:
+                    if cancel_event.is_set():
+                        raise ConversionCanceled()
+                    try:
+                        data = future.result(timeout=CANCEL_POLL_INTERVAL)
+                        break
+                    except FutureTimeout:
+                        continue
+                    except ConversionCanceled:
+                        raise
+                    except Exception as e:
+                        raise ChunkFailedError(index, len(chunks), e)
+                yield data
+        finally:
+            abort.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def synthesize_to_file(self, text, path, lang='en', slow=False, cancel_event=None, progress=None,
+                           transform=None):
+        temp_path = path + '.part'
+        try:
+            with open(temp_path, 'wb') as f:
+                for data in self.iter_chunks(text, lang, slow, cancel_event, progress, transform):
+                    with span('disk.write', bytes=len(data)):
+                        f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return path
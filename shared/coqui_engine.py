@@ -0,0 +1,50 @@
+from audio_buffer import synthesize
+from lazy_imports import tts_api
+from sentence_batcher import supports_batching, synthesize_sentences
+from synthesis_engine import EngineCapabilities, SynthesisEngine, canceled_check, register_engine
+from tracing import span
+
+# Offline voices from Coqui TTS. Pass a loaded tts, or a load function that is
+# called for every use so the caller's model cache decides how long the model
+# stays in memory; with neither the model is loaded on first use and kept.
+class CoquiEngine(SynthesisEngine):
+    name = 'coqui'
+
+    def __init__(self, model_name=None, tts=None, load=None, cache=None, batch_size=8):
+        super().__init__(cache, batch_size)
+        self.model_name = model_name
+        self.tts = tts
+        self.load = load
+
+    def model(self):
+        if self.tts is not None:
+            return self.tts
+        if self.load:
+            return self.load(self.model_name)
+        with span('model.load', model=self.model_name):
+            self.tts = tts_api.TTS(model_name=self.model_name)
+        return self.tts
+
+    # Same keys the sentence cache has always used, so existing entries stay valid
+    def cache_id(self):
+        return self.model_name
+
+    def capabilities(self):
+        tts = self.model()
+        return EngineCapabilities(
+            self.name, offline=True, batching=supports_batching(tts),
+            max_segment_chars=self.max_segment_chars, encoded_format='wav',
+            sample_rate=tts.synthesizer.output_sample_rate,
+            languages=getattr(tts, 'languages', None) or ())
+
+    def synthesize(self, text):
+        return synthesize(self.model(), text)
+
+    # Similar-length sentences share padded forward passes where the model allows
+    def synthesize_batch(self, segments, cancel_event=None, progress=None):
+        buffers = synthesize_sentences(self.model(), segments, self.batch_size, canceled_check(cancel_event))
+        if progress:
+            progress.advance(len(buffers), audio_seconds=sum(buffer.duration for buffer in buffers))
+        return buffers
+
+register_engine(CoquiEngine.name, CoquiEngine)
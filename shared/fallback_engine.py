@@ -0,0 +1,90 @@
+import io
+import os
+import queue
+import sys
+import tempfile
+import threading
+from concurrent.futures import Future
+from tracing import span
+
+# Encode like the TTS service does (24 kHz mono, 32 kbit/s) so locally
+# rendered chunks can be appended to fetched ones
+MP3_PARAMETERS = ['-ar', '24000', '-ac', '1']
+MP3_BITRATE = '32k'
+
+# Speaks with the operating system's voices through pyttsx3 (SAPI5 on Windows,
+# espeak on Linux) for when the online service can't be reached. Needs pyttsx3
+# and pydub with ffmpeg; create() returns None when they are missing.
+# SAPI5 is a COM object that only works on the thread that created it, so the
+# pyttsx3 engine is created on first use on a thread of its own, and every
+# utterance is spoken there; callers on other threads wait for the result.
+class LocalSpeechEngine:
+    def __init__(self):
+        import pyttsx3
+        from pydub import AudioSegment
+        self.pyttsx3 = pyttsx3
+        self.audio_segment = AudioSegment
+        self.engine = None
+        self.default_rate = None
+        self.requests = queue.Queue()
+        self.thread = None
+        self.thread_lock = threading.Lock()
+
+    @classmethod
+    def create(cls):
+        try:
+            return cls()
+        except Exception as e:
+            print(f"Offline fallback is not available: {str(e)}")
+            return None
+
+    def run(self):
+        if sys.platform == 'win32':
+            import comtypes
+            comtypes.CoInitialize()
+        while True:
+            request = self.requests.get()
+            if request is None:
+                break
+            future, text, wav_path, slow = request
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                if self.engine is None:
+                    with span('model.load', model='pyttsx3'):
+                        self.engine = self.pyttsx3.init()
+                    self.default_rate = self.engine.getProperty('rate')
+                with span('inference.fallback', chars=len(text)):
+                    self.engine.setProperty('rate', int(self.default_rate * (0.75 if slow else 1.0)))
+                    self.engine.save_to_file(text, wav_path)
+                    self.engine.runAndWait()
+                future.set_result(wav_path)
+            except Exception as e:
+                future.set_exception(e)
+
+    # Queues the text for the speech thread, starting it on first use
+    def speak_to_file(self, text, wav_path, slow):
+        with self.thread_lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+        future = Future()
+        self.requests.put((future, text, wav_path, slow))
+        return future.result()
+
+    def synthesize(self, text, lang='en', slow=False):
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
+            wav_path = temp_file.name
+        try:
+            self.speak_to_file(text, wav_path, slow)
+            output = io.BytesIO()
+            with span('encode.mp3'):
+                self.audio_segment.from_wav(wav_path).export(output, format='mp3', bitrate=MP3_BITRATE,
+                                                             parameters=MP3_PARAMETERS)
+            return output.getvalue()
+        finally:
+            os.remove(wav_path)
+
+    def close(self):
+        if self.thread is not None:
+            self.requests.put(None)
@@ -0,0 +1,118 @@
+from audio_buffer import AudioBuffer
+from chunk_cache import ChunkCache
+from chunked_tts import ChunkedSynthesizer, ConversionCanceled, GTTS_BITRATE, MAX_CHUNK_CHARS, split_chunks
+from fallback_engine import LocalSpeechEngine
+from synthesis_engine import EngineCapabilities, SynthesisCanceled, SynthesisEngine, register_engine
+
+# gTTS answers with 24 kHz mono MP3
+GTTS_SAMPLE_RATE = 24000
+
+def _decode(chunk, data, words_per_minute):
+    # numpy and pydub are only needed once audio has to be decoded
+    from audio_output import decode_mp3
+    from time_stretch import stretch_to_wpm
+    samples, sample_rate = decode_mp3(data)
+    if words_per_minute:
+        samples = stretch_to_wpm(samples, sample_rate, chunk, words_per_minute)
+    return samples, sample_rate
+
+def _restretch(chunk, data, words_per_minute):
+    from audio_output import encode_mp3
+    return encode_mp3(*_decode(chunk, data, words_per_minute))
+
+# Google's online voices. Chunks are fetched in parallel over one keep-alive
+# session by a ChunkedSynthesizer, which also keeps the MP3 disk cache and
+# falls back to the system voice during an outage. Share one synthesizer
+# between engines (one per language and speed) so they share its connections.
+class GTTSEngine(SynthesisEngine):
+    name = 'gtts'
+    max_segment_chars = MAX_CHUNK_CHARS
+    segment_unit = 'chunks'
+
+    def __init__(self, lang='en', slow=False, synthesizer=None, workers=4, cache=None, batch_size=None):
+        super().__init__(cache, batch_size or 2 * workers)
+        self.lang = lang
+        self.slow = slow
+        if synthesizer is None:
+            synthesizer = ChunkedSynthesizer(workers=workers, cache=ChunkCache(), fallback=LocalSpeechEngine.create())
+        self.synthesizer = synthesizer
+
+    def cache_id(self):
+        return f"gtts-{self.lang}{'-slow' if self.slow else ''}"
+
+    def capabilities(self):
+        try:
+            from gtts.lang import tts_langs
+            languages = sorted(tts_langs())
+        except Exception:
+            languages = [self.lang]
+        return EngineCapabilities(
+            self.name, offline=False, batching=True, parallel_requests=self.synthesizer.workers,
+            max_segment_chars=self.max_segment_chars, encoded_format='mp3',
+            encoded_bitrate=GTTS_BITRATE, sample_rate=GTTS_SAMPLE_RATE, languages=languages)
+
+    def split(self, text):
+        return split_chunks(text, self.max_segment_chars)
+
+    def synthesize(self, text):
+        return self.synthesize_batch([text])[0]
+
+    # A batch is a set of requests in flight at once
+    def synthesize_batch(self, segments, cancel_event=None, progress=None):
+        transform = lambda chunk, data: _decode(chunk, data, 0)
+        try:
+            return [AudioBuffer(samples, sample_rate) for samples, sample_rate
+                    in self.synthesizer.iter_segments(segments, self.lang, self.slow, cancel_event, progress,
+                                                      transform)]
+        except ConversionCanceled:
+            raise SynthesisCanceled()
+
+    def render_encoded(self, segments, words_per_minute=0, cancel_event=None, progress=None):
+        transform = None
+        if words_per_minute:
+            transform = lambda chunk, data: _restretch(chunk, data, words_per_minute)
+        try:
+            return list(self.synthesizer.iter_segments(segments, self.lang, self.slow, cancel_event, progress,
+                                                       transform))
+        except ConversionCanceled:
+            raise SynthesisCanceled()
+
+    # The fetcher already yields chunks in order while later ones are still
+    # in flight, so it streams on its own instead of in windows; decoding and
+    # stretching run on its workers
+    def stream(self, text, words_per_minute=0, cancel_event=None, progress=None, quick_start=True):
+        transform = lambda chunk, data: _decode(chunk, data, words_per_minute)
+        try:
+            for samples, sample_rate in self.synthesizer.iter_chunks(text, self.lang, self.slow, cancel_event,
+                                                                     progress, transform):
+                yield AudioBuffer(samples, sample_rate)
+        except ConversionCanceled:
+            raise SynthesisCanceled()
+
+    # MP3 straight from the service; only decoded when the rate has to change
+    def stream_encoded(self, text, words_per_minute=0, cancel_event=None, progress=None):
+        transform = None
+        if words_per_minute:
+            transform = lambda chunk, data: _restretch(chunk, data, words_per_minute)
+        try:
+            yield from self.synthesizer.iter_chunks(text, self.lang, self.slow, cancel_event, progress, transform)
+        except ConversionCanceled:
+            raise SynthesisCanceled()
+
+    # MP3 chunks can simply be appended, so an MP3 file is written as they arrive
+    def save(self, text, path, words_per_minute=0, cancel_event=None, progress=None):
+        if not path.lower().endswith('.mp3'):
+            return super().save(text, path, words_per_minute, cancel_event, progress)
+        transform = None
+        if words_per_minute:
+            transform = lambda chunk, data: _restretch(chunk, data, words_per_minute)
+        try:
+            return self.synthesizer.synthesize_to_file(text, path, self.lang, self.slow, cancel_event, progress,
+                                                       transform)
+        except ConversionCanceled:
+            raise SynthesisCanceled()
+
+    def close(self):
+        self.synthesizer.close()
+
+register_engine(GTTSEngine.name, GTTSEngine)
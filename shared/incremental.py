@@ -0,0 +1,198 @@
+import difflib
+import os
+import time
+from audio_buffer import AudioBuffer
+from synthesis_engine import SynthesisCanceled
+from tracing import span
+
+# Past this many inserted or removed segments the exact diff gets slow
+# (time and memory grow with its square), so difflib takes over
+MAX_EDIT_DISTANCE = 100
+
+# The diff between two lists of segments, as (equal, old_start, old_end,
+# new_start, new_end) runs covering both lists. The unchanged head and tail
+# are matched directly; the edited middle gets Myers' shortest edit script,
+# which unlike difflib's longest-block heuristic keeps repeated sentences
+# (refrains, a duplicated paragraph) lined up with their own position.
+def diff_segments(old, new):
+    n, m = len(old), len(new)
+    prefix = 0
+    while prefix < min(n, m) and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < min(n, m) - prefix and old[n - 1 - suffix] == new[m - 1 - suffix]:
+        suffix += 1
+    middle_old, middle_new = old[prefix:n - suffix], new[prefix:m - suffix]
+    if not middle_old or not middle_new:
+        middle = [(False, 0, len(middle_old), 0, len(middle_new))] if middle_old or middle_new else []
+    else:
+        middle = _shortest_edit(middle_old, middle_new)
+        if middle is None:
+            middle = _longest_blocks(middle_old, middle_new)
+    runs = [(True, 0, prefix, 0, prefix)] if prefix else []
+    runs.extend((equal, i1 + prefix, i2 + prefix, j1 + prefix, j2 + prefix) for equal, i1, i2, j1, j2 in middle)
+    if suffix:
+        runs.append((True, n - suffix, n, m - suffix, m))
+    return runs
+
+# Myers' algorithm; None when the lists differ by more than MAX_EDIT_DISTANCE
+def _shortest_edit(old, new):
+    n, m = len(old), len(new)
+    furthest = {1: 0}
+    trace = []
+    for d in range(min(n + m, MAX_EDIT_DISTANCE) + 1):
+        trace.append(dict(furthest))
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and furthest[k - 1] < furthest[k + 1]):
+                x = furthest[k + 1]
+            else:
+                x = furthest[k - 1] + 1
+            y = x - k
+            while x < n and y < m and old[x] == new[y]:
+                x, y = x + 1, y + 1
+            furthest[k] = x
+            if x >= n and y >= m:
+                return _runs_from_trace(trace, n, m)
+    return None
+
+# Walks back from the end collecting the runs of equal segments
+def _runs_from_trace(trace, n, m):
+    matches = []
+    x, y = n, m
+    for d in range(len(trace) - 1, -1, -1):
+        furthest = trace[d]
+        k = x - y
+        if k == -d or (k != d and furthest[k - 1] < furthest[k + 1]):
+            previous_k = k + 1
+        else:
+            previous_k = k - 1
+        previous_x = furthest[previous_k]
+        previous_y = previous_x - previous_k
+        end_x, end_y = x, y
+        while x > previous_x and y > previous_y:
+            x, y = x - 1, y - 1
+        if x < end_x:
+            matches.append((x, end_x, y, end_y))
+        x, y = previous_x, previous_y
+    runs = []
+    x = y = 0
+    for i1, i2, j1, j2 in reversed(matches):
+        if x < i1 or y < j1:
+            runs.append((False, x, i1, y, j1))
+        runs.append((True, i1, i2, j1, j2))
+        x, y = i2, j2
+    if x < n or y < m:
+        runs.append((False, x, n, y, m))
+    return runs
+
+# Close to linear for mostly distinct sentences, for rewrites too large for
+# the exact diff
+def _longest_blocks(old, new):
+    runs = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, old, new, autojunk=False).get_opcodes():
+        if tag != 'equal' and runs and not runs[-1][0]:
+            runs[-1] = (False, runs[-1][1], i2, runs[-1][3], j2)
+        else:
+            runs.append((tag == 'equal', i1, i2, j1, j2))
+    return runs
+
+# Remembers the segments and audio of the last text it rendered. On the next
+# render the text is split the way the engine splits it and diffed against
+# that; unchanged segments are reused as they are and only new or edited ones
+# go to the engine, so the cost follows the size of the edit, not of the text.
+# With encoded the segments are kept as capabilities().encoded_format bytes.
+# last_stats has the counts and render time of the last completed render.
+class IncrementalRenderer:
+    def __init__(self, engine=None, encoded=False):
+        self.engine = engine
+        self.encoded = encoded
+        self.key = None
+        self.segments = []
+        self.rendered = []
+        self.last_stats = None
+
+    def set_engine(self, engine):
+        self.engine = engine
+
+    def reset(self):
+        self.key = None
+        self.segments = []
+        self.rendered = []
+
+    def render_window(self, segments, words_per_minute, cancel_event, progress):
+        if self.encoded:
+            return self.engine.render_encoded(segments, words_per_minute, cancel_event, progress)
+        return self.engine.render(segments, words_per_minute, cancel_event, progress)
+
+    # Yields one rendered segment per segment of the text, in order. Reused
+    # ones come out at once; the first segment that has to be rendered goes on
+    # its own so playback can start early, later ones in window_size() windows.
+    # Progress counts only the segments that are rendered.
+    def stream(self, text, words_per_minute=0, cancel_event=None, progress=None):
+        segments = self.engine.split(text)
+        if not segments:
+            raise ValueError("No text to convert")
+        key = (self.engine.cache_id(), words_per_minute, self.encoded)
+        old_segments, old_rendered = (self.segments, self.rendered) if key == self.key else ([], [])
+        runs = diff_segments(old_segments, segments)
+        changed = sum(j2 - j1 for equal, i1, i2, j1, j2 in runs if not equal)
+        if progress:
+            progress.set_total(changed, self.engine.segment_unit, "Synthesizing...")
+        window_size = self.engine.window_size() if changed else 1
+        rendered = []
+        rendered_chars = 0
+        # Only time spent rendering counts, not the consumer's (playback)
+        seconds = 0.0
+        with span('incremental.render', segments=len(segments), changed=changed):
+            for equal, i1, i2, j1, j2 in runs:
+                if equal:
+                    rendered.extend(old_rendered[i1:i2])
+                    yield from old_rendered[i1:i2]
+                    continue
+                start = j1
+                while start < j2:
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise SynthesisCanceled()
+                    size = 1 if not rendered else window_size
+                    window = segments[start:min(start + size, j2)]
+                    started_at = time.perf_counter()
+                    items = self.render_window(window, words_per_minute, cancel_event, progress)
+                    seconds += time.perf_counter() - started_at
+                    start += len(window)
+                    rendered_chars += sum(len(segment) for segment in window)
+                    rendered.extend(items)
+                    yield from items
+        self.key = key
+        self.segments = segments
+        self.rendered = rendered
+        self.last_stats = {
+            'segments': len(segments),
+            'reused': len(segments) - changed,
+            'rendered': changed,
+            'rendered_chars': rendered_chars,
+            'seconds': seconds,
+        }
+        if progress:
+            progress.finish()
+
+    def render(self, text, words_per_minute=0, cancel_event=None, progress=None):
+        return list(self.stream(text, words_per_minute, cancel_event, progress))
+
+    # Encoded segments are written as they are, which needs a format that can
+    # simply be appended (MP3); decoded ones are joined into one WAV
+    def save(self, text, path, words_per_minute=0, cancel_event=None, progress=None):
+        rendered = self.render(text, words_per_minute, cancel_event, progress)
+        if progress:
+            progress.set_stage("Saving...")
+        if not self.encoded:
+            AudioBuffer.concatenate(rendered).save(path)
+            return path
+        if self.engine.capabilities().encoded_format != 'mp3':
+            raise ValueError("Only MP3 segments can be joined without decoding")
+        with span('disk.write', path=path):
+            partial = path + '.part'
+            with open(partial, 'wb') as f:
+                for data in rendered:
+                    f.write(data)
+            os.replace(partial, path)
+        return path
@@ -0,0 +1,43 @@
+import importlib
+import threading
+import time
+
+import_timings = {}
+
+# Stand-in for a heavy module (torch via TTS, pydub) that is only imported on
+# first attribute access, or ahead of time by warm_up()
+class LazyModule:
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    started_at = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    import_timings[self._name] = time.perf_counter() - started_at
+                    self._module = module
+        return self._module
+
+    def is_loaded(self):
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+tts_api = LazyModule('TTS.api')
+pydub = LazyModule('pydub')
+pydub_playback = LazyModule('pydub.playback')
+
+HEAVY_MODULES = [pydub, pydub_playback, tts_api]
+
+def warm_up(modules=None):
+    for module in modules or HEAVY_MODULES:
+        try:
+            module.load()
+        except Exception as e:
+            print(f"Failed to preload {module._name}: {str(e)}")
+    return dict(import_timings)
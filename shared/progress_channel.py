@@ -0,0 +1,135 @@
+import threading
+import time
+
+class ProgressEvent:
+    def __init__(self, job_id, stage, done, total, unit, nbytes, audio_seconds, elapsed, finished=False):
+        self.job_id = job_id
+        self.stage = stage
+        self.done = done
+        self.total = total
+        self.unit = unit
+        self.nbytes = nbytes
+        self.audio_seconds = audio_seconds
+        self.elapsed = elapsed
+        self.finished = finished
+
+    @property
+    def fraction(self):
+        if self.finished:
+            return 1.0
+        return min(1.0, self.done / self.total) if self.total else 0.0
+
+    @property
+    def percent(self):
+        return int(100 * self.fraction)
+
+    @property
+    def units_per_second(self):
+        return self.done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def bytes_per_second(self):
+        return self.nbytes / self.elapsed if self.elapsed > 0 else 0.0
+
+    # Seconds of audio produced per second of work
+    @property
+    def speed(self):
+        return self.audio_seconds / self.elapsed if self.elapsed > 0 else 0.0
+
+    # None until there is a rate to extrapolate from
+    @property
+    def eta(self):
+        if self.finished:
+            return 0.0
+        rate = self.units_per_second
+        if not self.total or not rate:
+            return None
+        return max(0.0, (self.total - self.done) / rate)
+
+    def describe(self):
+        if not self.total:
+            return self.stage
+        parts = [f"{self.done}/{self.total} {self.unit}"]
+        if self.nbytes:
+            parts.append(f"{self.bytes_per_second / 1024:.1f} KB/s")
+        if self.audio_seconds:
+            parts.append(f"{self.speed:.1f}x real time")
+        if self.eta is not None and self.done < self.total:
+            minutes, seconds = divmod(int(self.eta + 0.5), 60)
+            parts.append(f"ETA {minutes}:{seconds:02d}")
+        return " · ".join(parts)
+
+# Delivers progress events to subscribers at most once per min_interval so a
+# fast producer can't flood the UI thread. Events in between are dropped;
+# forced events (stage changes, completion) always go through. Subscribers are
+# called on the publishing thread and must hand the event to their own UI
+# thread (root.after for Tk, a queued signal for Qt).
+class ProgressChannel:
+    def __init__(self, min_interval=0.1):
+        self.min_interval = min_interval
+        self.subscribers = []
+        self.lock = threading.Lock()
+        self.last_sent = 0.0
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+
+    def publish(self, event, force=False):
+        with self.lock:
+            now = time.monotonic()
+            if not force and now - self.last_sent < self.min_interval:
+                return False
+            self.last_sent = now
+        for callback in list(self.subscribers):
+            callback(event)
+        return True
+
+# Counts the work done on one job (units such as chunks or sentences, bytes
+# received, audio seconds rendered) and publishes snapshots to a channel.
+# Rates and the ETA are measured from set_total(), so set-up time like model
+# loading doesn't skew them.
+class ProgressTracker:
+    def __init__(self, channel, job_id=0, stage=''):
+        self.channel = channel
+        self.job_id = job_id
+        self.stage = stage
+        self.lock = threading.Lock()
+        self.done = 0
+        self.total = 0
+        self.unit = ''
+        self.nbytes = 0
+        self.audio_seconds = 0.0
+        self.started_at = time.perf_counter()
+        self.finished = False
+
+    def snapshot(self):
+        with self.lock:
+            return ProgressEvent(self.job_id, self.stage, self.done, self.total, self.unit, self.nbytes,
+                                 self.audio_seconds, time.perf_counter() - self.started_at, self.finished)
+
+    def set_stage(self, stage):
+        with self.lock:
+            self.stage = stage
+        self.channel.publish(self.snapshot(), force=True)
+
+    def set_total(self, total, unit, stage=None):
+        with self.lock:
+            self.total = total
+            self.unit = unit
+            if stage is not None:
+                self.stage = stage
+            self.started_at = time.perf_counter()
+        self.channel.publish(self.snapshot(), force=True)
+
+    def advance(self, units=1, nbytes=0, audio_seconds=0.0):
+        with self.lock:
+            self.done += units
+            self.nbytes += nbytes
+            self.audio_seconds += audio_seconds
+            last = self.total and self.done >= self.total
+        self.channel.publish(self.snapshot(), force=bool(last))
+
+    def finish(self):
+        with self.lock:
+            self.finished = True
+        self.channel.publish(self.snapshot(), force=True)
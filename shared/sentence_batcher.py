@@ -0,0 +1,71 @@
+from audio_buffer import AudioBuffer, synthesize
+from tracing import span
+
+# Silence the TTS synthesizer appends after every sentence; batched output
+# gets the same gap so it sounds identical to per-sentence synthesis
+SENTENCE_GAP = 10000
+
+def group_by_length(sentences, max_batch_size=8, max_length_ratio=1.5):
+    # Sorting by length keeps padding (wasted compute) inside a batch small
+    order = sorted(range(len(sentences)), key=lambda index: len(sentences[index]))
+    batches = []
+    batch = []
+    for index in order:
+        if batch and (len(batch) >= max_batch_size or
+                      len(sentences[index]) > max_length_ratio * max(1, len(sentences[batch[0]]))):
+            batches.append(batch)
+            batch = []
+        batch.append(index)
+    if batch:
+        batches.append(batch)
+    return batches
+
+def supports_batching(tts):
+    model = getattr(getattr(tts, 'synthesizer', None), 'tts_model', None)
+    if model is None or getattr(tts, '_batching_failed', False):
+        return False
+    # Single speaker, single language VITS models accept padded batches with x_lengths
+    return (type(model).__name__ == 'Vits' and hasattr(model, 'tokenizer')
+            and getattr(model, 'num_speakers', 0) <= 1
+            and not getattr(model, 'embedded_language_dim', 0))
+
+def _padded_forward(tts, sentences):
+    import numpy as np
+    import torch
+    synthesizer = tts.synthesizer
+    model = synthesizer.tts_model
+    token_ids = [model.tokenizer.text_to_ids(sentence) for sentence in sentences]
+    lengths = torch.LongTensor([len(ids) for ids in token_ids])
+    x = torch.zeros(len(token_ids), int(lengths.max()), dtype=torch.long)
+    for row, ids in enumerate(token_ids):
+        x[row, :len(ids)] = torch.LongTensor(ids)
+    device = next(model.parameters()).device
+    with torch.no_grad(), span('inference.batch', sentences=len(sentences)):
+        outputs = model.inference(x.to(device), aux_input={'x_lengths': lengths.to(device)})
+    hop_length = model.config.audio.hop_length
+    wav_lengths = (outputs['y_mask'].sum(dim=[1, 2]) * hop_length).long().tolist()
+    waveforms = outputs['model_outputs'].squeeze(1).cpu().numpy()
+    gap = np.zeros(SENTENCE_GAP, dtype=np.float32)
+    return [AudioBuffer(np.concatenate([waveforms[row, :wav_lengths[row]], gap]), synthesizer.output_sample_rate)
+            for row in range(len(sentences))]
+
+# One forward pass for the whole batch when the model supports it, otherwise
+# one call per sentence
+def synthesize_batch(tts, sentences):
+    if len(sentences) > 1 and supports_batching(tts):
+        try:
+            return _padded_forward(tts, sentences)
+        except Exception as e:
+            print(f"Batched inference failed, falling back to one sentence at a time: {str(e)}")
+            tts._batching_failed = True
+    return [synthesize(tts, sentence) for sentence in sentences]
+
+# check is called before every batch so a caller can abort between them
+def synthesize_sentences(tts, sentences, max_batch_size=8, check=None):
+    buffers = [None] * len(sentences)
+    for batch in group_by_length(sentences, max_batch_size):
+        if check:
+            check()
+        for index, buffer in zip(batch, synthesize_batch(tts, [sentences[index] for index in batch])):
+            buffers[index] = buffer
+    return buffers
@@ -0,0 +1,34 @@
+import re
+from tracing import traced
+
+SENTENCE_END = re.compile(r'[.!?]+["\')\]]*\s+|\n\s*\n')
+ABBREVIATIONS = {'mr.', 'mrs.', 'ms.', 'dr.', 'prof.', 'sr.', 'jr.', 'st.', 'vs.', 'etc.', 'e.g.', 'i.e.'}
+
+@traced('text.normalize')
+def split_sentences(text, max_chars=250):
+    sentences = []
+    start = 0
+    for match in SENTENCE_END.finditer(text):
+        words = text[start:match.end()].split()
+        # Don't break after "Dr." and friends
+        if words and words[-1].lower() in ABBREVIATIONS:
+            continue
+        sentences.extend(split_long(text[start:match.end()], max_chars))
+        start = match.end()
+    sentences.extend(split_long(text[start:], max_chars))
+    return sentences
+
+def split_long(sentence, max_chars):
+    sentence = ' '.join(sentence.split())
+    pieces = []
+    while len(sentence) > max_chars:
+        cut = max(sentence.rfind(', ', 0, max_chars), sentence.rfind('; ', 0, max_chars))
+        if cut <= 0:
+            cut = sentence.rfind(' ', 0, max_chars)
+        if cut <= 0:
+            cut = max_chars - 1
+        pieces.append(sentence[:cut + 1].strip())
+        sentence = sentence[cut + 1:].strip()
+    if sentence:
+        pieces.append(sentence)
+    return pieces
@@ -0,0 +1,124 @@
+import queue
+import threading
+import time
+from audio_output import AudioOutput, default_sink
+from lazy_imports import pydub_playback
+from tracing import span
+
+# Without simpleaudio pydub can only play a segment to the end, so audio is
+# played in slices this long and stop() takes effect between them
+PLAYBACK_SLICE_MS = 500
+
+# Plays audio chunks back to back as they are fed in, so the first sentence
+# can be heard while the rest of the text is still being synthesized. With a
+# sink (the sound card through sounddevice, or a file/null sink for headless
+# runs) audio goes through the ring-buffered AudioOutput, which can also seek;
+# otherwise each chunk is played with pydub.
+class StreamingPlayer(threading.Thread):
+    def __init__(self, on_first_audio=None, on_underrun=None, sink=None):
+        super().__init__(daemon=True)
+        self.chunks = queue.Queue()
+        self.on_first_audio = on_first_audio
+        self.on_underrun = on_underrun
+        self.sink = sink
+        self.output = None
+        self.first_audio_at = None
+        self.error = None
+        self._stopped = threading.Event()
+        self._resumed = threading.Event()
+        self._resumed.set()
+
+    def feed(self, buffer):
+        self.chunks.put(buffer)
+
+    def finish(self):
+        self.chunks.put(None)
+
+    def stop(self):
+        self._stopped.set()
+        self._resumed.set()
+        self.chunks.put(None)
+
+    def pause(self):
+        self._resumed.clear()
+        if self.output:
+            self.output.pause()
+
+    def resume(self):
+        self._resumed.set()
+        if self.output:
+            self.output.resume()
+
+    def seek(self, seconds):
+        if self.output:
+            self.output.seek(seconds)
+
+    @property
+    def paused(self):
+        return not self._resumed.is_set()
+
+    @property
+    def underruns(self):
+        return self.output.underruns if self.output else 0
+
+    def report_first_audio(self, at):
+        self.first_audio_at = at
+        if self.on_first_audio:
+            self.on_first_audio(at)
+
+    def run(self):
+        sink = self.sink or default_sink()
+        try:
+            if sink:
+                self.run_stream(sink)
+            else:
+                self.run_segments()
+        except Exception as e:
+            self.error = e
+
+    def run_stream(self, sink):
+        self.output = AudioOutput(sink, on_first_audio=self.report_first_audio, on_underrun=self.on_underrun)
+        if not self._resumed.is_set():
+            self.output.pause()
+        try:
+            with span('playback.stream', sink=type(sink).__name__) as playback:
+                while not self._stopped.is_set():
+                    buffer = self.chunks.get()
+                    if buffer is None or self._stopped.is_set():
+                        break
+                    self.output.feed(buffer.samples, buffer.sample_rate)
+                self.output.finish()
+                while not self._stopped.is_set() and not self.output.wait(0.05):
+                    pass
+                playback.set(underruns=self.output.underruns)
+            if self.output.error:
+                raise self.output.error
+        finally:
+            self.output.stop()
+
+    def run_segments(self):
+        while not self._stopped.is_set():
+            buffer = self.chunks.get()
+            if buffer is None or self._stopped.is_set():
+                break
+            with span('encode.segment'):
+                audio = buffer.to_segment()
+            if self.first_audio_at is None:
+                self.report_first_audio(time.perf_counter())
+            with span('playback', seconds=round(buffer.duration, 2)):
+                self.play(audio)
+
+    def play(self, audio):
+        try:
+            playback = pydub_playback._play_with_simpleaudio(audio)
+        except ImportError:
+            for start in range(0, len(audio), PLAYBACK_SLICE_MS):
+                self._resumed.wait()
+                if self._stopped.is_set():
+                    return
+                pydub_playback.play(audio[start:start + PLAYBACK_SLICE_MS])
+            return
+        while playback.is_playing():
+            if self._stopped.wait(0.02):
+                playback.stop()
+                return
@@ -0,0 +1,39 @@
+import math
+import time
+import zlib
+import numpy as np
+from audio_buffer import AudioBuffer
+from synthesis_engine import EngineCapabilities, SynthesisEngine, register_engine
+from tracing import span
+
+# Speech pace and sample rate of the stand-in voice
+STUB_CHARS_PER_SECOND = 15
+STUB_SAMPLE_RATE = 22050
+
+# Deterministic stand-in for a real voice: the same text always gives the same
+# tone, as long as it would take to speak, and "inference" takes a fixed
+# fraction of that. For benchmarks and checks on machines without model
+# weights or network.
+class StubEngine(SynthesisEngine):
+    name = 'stub'
+
+    def __init__(self, real_time_factor=0.01, load_seconds=0.2, cache=None, batch_size=8):
+        super().__init__(cache, batch_size)
+        self.real_time_factor = real_time_factor
+        with span('model.load', model=self.name):
+            time.sleep(load_seconds)
+
+    def capabilities(self):
+        return EngineCapabilities(self.name, offline=True, max_segment_chars=self.max_segment_chars,
+                                  sample_rate=STUB_SAMPLE_RATE, languages=['en'])
+
+    def synthesize(self, text):
+        seconds = max(0.2, len(text) / STUB_CHARS_PER_SECOND)
+        with span('inference', chars=len(text)):
+            time.sleep(seconds * self.real_time_factor)
+            frequency = 120 + zlib.crc32(text.encode('utf-8')) % 120
+            t = np.arange(int(seconds * STUB_SAMPLE_RATE), dtype=np.float32) / STUB_SAMPLE_RATE
+            samples = (0.3 * np.sin(2 * math.pi * frequency * t)).astype(np.float32)
+        return AudioBuffer(samples, STUB_SAMPLE_RATE)
+
+register_engine(StubEngine.name, StubEngine)
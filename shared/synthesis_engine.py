@@ -0,0 +1,173 @@
+import importlib
+from audio_buffer import AudioBuffer
+from sentence_splitter import split_sentences
+from time_stretch import stretch_to_wpm
+
+class SynthesisCanceled(Exception):
+    pass
+
+# A function that raises SynthesisCanceled once cancel_event is set, for
+# backends that poll between steps
+def canceled_check(cancel_event):
+    def check():
+        if cancel_event is not None and cancel_event.is_set():
+            raise SynthesisCanceled()
+    return check
+
+# What a backend can do, so callers can pick a code path (stream or not,
+# which file format to hand to a player) without knowing which backend it is
+class EngineCapabilities:
+    def __init__(self, name, offline, batching=False, parallel_requests=1, max_segment_chars=250,
+                 encoded_format='wav', encoded_bitrate=None, sample_rate=None, languages=()):
+        self.name = name
+        self.offline = offline
+        self.batching = batching
+        self.parallel_requests = parallel_requests
+        self.max_segment_chars = max_segment_chars
+        self.encoded_format = encoded_format
+        # Set for constant bitrate formats, where size gives duration
+        self.encoded_bitrate = encoded_bitrate
+        self.sample_rate = sample_rate
+        self.languages = list(languages)
+
+    def to_dict(self):
+        return dict(vars(self))
+
+# Front end shared by every TTS backend. A backend implements synthesize()
+# for one segment, and synthesize_batch() when it can do several at once
+# better than one after another (padded forward passes, parallel requests).
+# Splitting, the sentence cache, exact speech rate, first-segment-first
+# streaming, cancel and progress are implemented here once for all of them.
+class SynthesisEngine:
+    name = None
+    max_segment_chars = 250
+    # What split() produces, for progress reports
+    segment_unit = 'sentences'
+
+    def __init__(self, cache=None, batch_size=8):
+        self.cache = cache
+        self.batch_size = max(1, batch_size)
+
+    def capabilities(self):
+        raise NotImplementedError
+
+    # Namespace of this engine's entries in the audio cache; must change
+    # whenever the voice does
+    def cache_id(self):
+        return self.name
+
+    def split(self, text):
+        return split_sentences(text, self.max_segment_chars)
+
+    # Segments rendered together after the first. Waiting for a full window
+    # only pays off when the backend really renders them at once; otherwise
+    # each segment is handed on as soon as it is done.
+    def window_size(self):
+        return self.batch_size if self.capabilities().batching else 1
+
+    def synthesize(self, text):
+        raise NotImplementedError
+
+    # Stops with SynthesisCanceled once cancel_event is set, and advances
+    # progress as segments are done
+    def synthesize_batch(self, segments, cancel_event=None, progress=None):
+        check = canceled_check(cancel_event)
+        buffers = []
+        for segment in segments:
+            check()
+            buffer = self.synthesize(segment)
+            if progress:
+                progress.advance(1, audio_seconds=buffer.duration)
+            buffers.append(buffer)
+        return buffers
+
+    # Segments already rendered with this voice come from the cache, the
+    # rest go to the backend as one batch. The cache holds the voice's
+    # natural pace; the rate is applied per segment afterwards.
+    def render(self, segments, words_per_minute=0, cancel_event=None, progress=None):
+        buffers = [None] * len(segments)
+        if self.cache is not None:
+            for index, segment in enumerate(segments):
+                buffers[index] = self.cache.get(self.cache_id(), segment)
+            cached = [buffer for buffer in buffers if buffer is not None]
+            if progress and cached:
+                progress.advance(len(cached), audio_seconds=sum(buffer.duration for buffer in cached))
+        missing = [index for index, buffer in enumerate(buffers) if buffer is None]
+        if missing:
+            rendered = self.synthesize_batch([segments[index] for index in missing], cancel_event, progress)
+            for index, buffer in zip(missing, rendered):
+                buffers[index] = buffer
+                if self.cache is not None:
+                    self.cache.put(self.cache_id(), segments[index], buffer)
+        if words_per_minute:
+            buffers = [AudioBuffer(stretch_to_wpm(buffer.samples, buffer.sample_rate, segment, words_per_minute),
+                                   buffer.sample_rate) for segment, buffer in zip(segments, buffers)]
+        return buffers
+
+    # render() with each segment encoded as capabilities().encoded_format
+    def render_encoded(self, segments, words_per_minute=0, cancel_event=None, progress=None):
+        return [buffer.to_wav_bytes() for buffer in self.render(segments, words_per_minute, cancel_event, progress)]
+
+    # Yields one buffer per segment in text order. With quick_start the first
+    # segment is rendered on its own so playback can begin as early as
+    # possible; the rest go in window_size() windows.
+    def stream(self, text, words_per_minute=0, cancel_event=None, progress=None, quick_start=True):
+        check = canceled_check(cancel_event)
+        segments = self.split(text)
+        if not segments:
+            raise ValueError("No text to convert")
+        if progress:
+            progress.set_total(len(segments), self.segment_unit, "Synthesizing...")
+        window_size = self.window_size()
+        start = 0
+        while start < len(segments):
+            check()
+            size = 1 if quick_start and start == 0 else window_size
+            window = self.render(segments[start:start + size], words_per_minute, cancel_event, progress)
+            start += size
+            yield from window
+        if progress:
+            progress.finish()
+
+    # Like stream(), but each segment already encoded as
+    # capabilities().encoded_format, ready for a file-based player
+    def stream_encoded(self, text, words_per_minute=0, cancel_event=None, progress=None):
+        for buffer in self.stream(text, words_per_minute, cancel_event, progress):
+            yield buffer.to_wav_bytes()
+
+    def synthesize_text(self, text, words_per_minute=0, cancel_event=None, progress=None):
+        return AudioBuffer.concatenate(list(self.stream(text, words_per_minute, cancel_event, progress,
+                                                        quick_start=False)))
+
+    def save(self, text, path, words_per_minute=0, cancel_event=None, progress=None):
+        buffer = self.synthesize_text(text, words_per_minute, cancel_event, progress)
+        if progress:
+            progress.set_stage("Saving...")
+        buffer.save(path)
+        return path
+
+    def close(self):
+        pass
+
+# Backends register a factory under a name. The built-in ones are imported on
+# first use so an app only pulls in the backend (torch, gTTS) it actually uses.
+BUILTIN_ENGINES = {
+    'coqui': 'coqui_engine',
+    'gtts': 'gtts_engine',
+    'stub': 'stub_engine',
+}
+
+_engines = {}
+
+def register_engine(name, factory):
+    _engines[name] = factory
+
+def available_engines():
+    return sorted(set(_engines) | set(BUILTIN_ENGINES))
+
+def create_engine(name, **options):
+    if name not in _engines and name in BUILTIN_ENGINES:
+        importlib.import_module(BUILTIN_ENGINES[name])
+    if name not in _engines:
+        raise ValueError(f"Unknown engine {name}; available: {', '.join(available_engines())}")
+    return _engines[name](**options)
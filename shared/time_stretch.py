@@ -0,0 +1,71 @@
+import numpy as np
+from tracing import traced
+
+# Rates outside this range sound too smeared to be useful
+MIN_RATE = 0.5
+MAX_RATE = 2.0
+
+def _frames(samples, frame_size, hop):
+    padded = np.pad(samples, (frame_size // 2, frame_size // 2 + hop))
+    count = 1 + (len(padded) - frame_size) // hop
+    stride = padded.strides[0]
+    return np.lib.stride_tricks.as_strided(padded, (count, frame_size), (stride * hop, stride))
+
+def _overlap_add(frames, hop):
+    count, frame_size = frames.shape
+    output = np.zeros((count + frame_size // hop) * hop, dtype=np.float32)
+    for offset in range(0, frame_size, hop):
+        output[offset:offset + count * hop] += frames[:, offset:offset + hop].reshape(-1)
+    return output
+
+# Phase vocoder: changes duration by 1/rate without changing pitch. All frames
+# are transformed at once and phases are accumulated with a cumulative sum,
+# so the only Python loop is the frame_size/hop step overlap-add.
+def time_stretch(samples, rate, frame_size=1024, hop=256):
+    samples = np.asarray(samples, dtype=np.float32)
+    if abs(rate - 1.0) < 0.01 or len(samples) < frame_size:
+        return samples
+    window = np.hanning(frame_size + 1)[:-1].astype(np.float32)
+    spectrum = np.fft.rfft(_frames(samples, frame_size, hop) * window, axis=1)
+
+    # Output frame t reads the input at fractional frame t * rate
+    steps = np.arange(0, len(spectrum) - 1, rate)
+    index = steps.astype(int)
+    fraction = (steps - index)[:, None]
+    magnitude = (1 - fraction) * np.abs(spectrum[index]) + fraction * np.abs(spectrum[index + 1])
+
+    expected = 2 * np.pi * hop * np.arange(spectrum.shape[1]) / frame_size
+    deviation = np.angle(spectrum[index + 1]) - np.angle(spectrum[index]) - expected
+    deviation -= 2 * np.pi * np.round(deviation / (2 * np.pi))
+    advance = np.cumsum(expected + deviation, axis=0)
+    phase = np.angle(spectrum[0]) + np.vstack([np.zeros_like(advance[:1]), advance[:-1]])
+
+    frames = np.fft.irfft(magnitude * np.exp(1j * phase), n=frame_size, axis=1).astype(np.float32) * window
+    output = _overlap_add(frames, hop)
+    norm = _overlap_add(np.tile(window ** 2, (len(frames), 1)), hop)
+    output /= np.maximum(norm, 1e-3)
+    length = int(round(len(samples) / rate))
+    return output[frame_size // 2:frame_size // 2 + length]
+
+# Seconds from the first to the last sample louder than threshold (relative
+# to the peak), i.e. without the silence around the speech
+def speech_duration(samples, sample_rate, threshold=0.02):
+    if len(samples) == 0:
+        return 0.0
+    loud = np.flatnonzero(np.abs(samples) > threshold * np.abs(samples).max())
+    if len(loud) == 0:
+        return 0.0
+    return (loud[-1] - loud[0] + 1) / sample_rate
+
+# How much to speed speech up so text is spoken at exactly words_per_minute
+def rate_for_wpm(samples, sample_rate, text, words_per_minute):
+    words = len(text.split())
+    seconds = speech_duration(samples, sample_rate)
+    if not words_per_minute or not words or not seconds:
+        return 1.0
+    natural_wpm = words / (seconds / 60)
+    return min(MAX_RATE, max(MIN_RATE, words_per_minute / natural_wpm))
+
+@traced('encode.stretch')
+def stretch_to_wpm(samples, sample_rate, text, words_per_minute):
+    return time_stretch(samples, rate_for_wpm(samples, sample_rate, text, words_per_minute))
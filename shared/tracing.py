@@ -0,0 +1,199 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+
+# Set to a file name (or 1 for the default) to record a profile of the run;
+# the trace is written there on exit with the per-stage summary next to it
+PROFILE_ENV = 'NOISYQUILL_PROFILE'
+DEFAULT_TRACE_FILE = 'noisyquill-trace.json'
+
+# Upper bounds of the histogram buckets, in milliseconds
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def set(self, **args):
+        pass
+
+# Returned while profiling is off, so an untraced span costs one attribute
+# check and no allocation
+_NULL_SPAN = _NullSpan()
+
+class Span:
+    __slots__ = ('tracer', 'name', 'args', 'start')
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = time.perf_counter()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.record(self.name, self.start, end, self.args)
+        return False
+
+    def set(self, **args):
+        self.args.update(args)
+
+# Collects timed spans from every thread. Spans are kept for the Chrome trace
+# (up to max_events; durations for the histograms are always kept) and
+# written out by dump(), which enable() registers to run at exit.
+class Tracer:
+    def __init__(self, max_events=200000):
+        self.enabled = False
+        self.output_path = None
+        self.max_events = max_events
+        self.events = []
+        self.durations = {}
+        self.dropped = 0
+        self.thread_names = {}
+        self.origin = time.perf_counter()
+        self.lock = threading.Lock()
+        self._registered = False
+
+    def enable(self, output_path=None):
+        self.output_path = output_path or DEFAULT_TRACE_FILE
+        self.enabled = True
+        if not self._registered:
+            atexit.register(self.dump)
+            self._registered = True
+
+    def disable(self):
+        self.enabled = False
+
+    def span(self, name, **args):
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, args)
+
+    def record(self, name, start, end, args=None):
+        thread = threading.current_thread()
+        with self.lock:
+            self.durations.setdefault(name, []).append(end - start)
+            if len(self.events) < self.max_events:
+                self.events.append((name, start, end - start, thread.ident, args))
+                self.thread_names.setdefault(thread.ident, thread.name)
+            else:
+                self.dropped += 1
+
+    def clear(self):
+        with self.lock:
+            self.events = []
+            self.durations = {}
+            self.dropped = 0
+
+    def histograms(self):
+        with self.lock:
+            durations = {name: sorted(values) for name, values in self.durations.items()}
+        stages = {}
+        for name, values in durations.items():
+            buckets = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+            for value in values:
+                milliseconds = 1000 * value
+                index = 0
+                while index < len(HISTOGRAM_BUCKETS_MS) and milliseconds > HISTOGRAM_BUCKETS_MS[index]:
+                    index += 1
+                buckets[index] += 1
+            stages[name] = {
+                'count': len(values),
+                'total_ms': round(1000 * sum(values), 3),
+                'mean_ms': round(1000 * sum(values) / len(values), 3),
+                'p50_ms': round(1000 * values[len(values) // 2], 3),
+                'p95_ms': round(1000 * values[int(len(values) * 0.95)], 3),
+                'max_ms': round(1000 * values[-1], 3),
+                'buckets_ms': {f"<={bound}" if bound else f">{HISTOGRAM_BUCKETS_MS[-1]}": count
+                               for bound, count in zip(HISTOGRAM_BUCKETS_MS + (None,), buckets) if count},
+            }
+        return stages
+
+    # Complete ("X") events in the Chrome trace event format; open the file in
+    # chrome://tracing or https://ui.perfetto.dev
+    def chrome_trace(self):
+        pid = os.getpid()
+        with self.lock:
+            events = list(self.events)
+            thread_names = dict(self.thread_names)
+        trace_events = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                        for tid, name in thread_names.items()]
+        for name, start, duration, tid, args in events:
+            event = {
+                'name': name,
+                'cat': name.split('.')[0],
+                'ph': 'X',
+                'ts': round(1e6 * (start - self.origin), 3),
+                'dur': round(1e6 * duration, 3),
+                'pid': pid,
+                'tid': tid,
+            }
+            if args:
+                event['args'] = {key: value if isinstance(value, (int, float, bool)) else str(value)
+                                 for key, value in args.items()}
+            trace_events.append(event)
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+    def report(self):
+        stages = self.histograms()
+        lines = [f"{'stage':<24} {'count':>7} {'total ms':>11} {'mean':>9} {'p50':>9} {'p95':>9} {'max':>9}"]
+        for name, stage in sorted(stages.items(), key=lambda item: -item[1]['total_ms']):
+            lines.append(f"{name:<24} {stage['count']:>7} {stage['total_ms']:>11.1f} {stage['mean_ms']:>9.2f} "
+                         f"{stage['p50_ms']:>9.2f} {stage['p95_ms']:>9.2f} {stage['max_ms']:>9.2f}")
+            lines.append(f"{'':<24} " + '  '.join(f"{bucket}:{count}" for bucket, count in stage['buckets_ms'].items()))
+        if self.dropped:
+            lines.append(f"({self.dropped} spans beyond {self.max_events} were left out of the trace)")
+        return '\n'.join(lines)
+
+    def dump(self, output_path=None):
+        output_path = output_path or self.output_path or DEFAULT_TRACE_FILE
+        if not self.durations:
+            return
+        try:
+            with open(output_path, 'w') as f:
+                json.dump(self.chrome_trace(), f)
+            with open(f"{os.path.splitext(output_path)[0]}-stages.json", 'w') as f:
+                json.dump(self.histograms(), f, indent=4)
+        except OSError as e:
+            print(f"Could not write the profile: {str(e)}")
+            return
+        print(self.report())
+        print(f"Trace written to {output_path}")
+
+tracer = Tracer()
+
+def span(name, **args):
+    return tracer.span(name, **args)
+
+def traced(name):
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return function(*args, **kwargs)
+            with Span(tracer, name, {}):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def enable_profiling(output_path=None):
+    tracer.enable(output_path)
+
+def _enable_from_environment():
+    value = os.environ.get(PROFILE_ENV, '').strip()
+    if value and value != '0':
+        tracer.enable(None if value == '1' else value)
+
+_enable_from_environment()
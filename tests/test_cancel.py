@@ -0,0 +1,129 @@
+import base64
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, 'shared'), os.path.join(ROOT, 'offline')]
+
+from audio_output import NullSink
+from synthesis_engine import SynthesisCanceled, create_engine
+
+# Cancel has to return within this long, wherever synthesis or playback is
+CANCEL_BOUND = 0.5
+
+TEXT = ' '.join(f"This is sentence number {index} of a story that goes on for a while." for index in range(12))
+
+# Runs target on a thread, cancels after delay and returns how long the
+# thread took to stop after cancel, and what it raised
+def cancel_after(test, target, cancel, delay):
+    outcome = {}
+
+    def run():
+        try:
+            outcome['result'] = target()
+        except Exception as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    time.sleep(delay)
+    test.assertTrue(thread.is_alive(), "finished before it could be canceled")
+    canceled_at = time.perf_counter()
+    cancel()
+    thread.join(5)
+    elapsed = time.perf_counter() - canceled_at
+    test.assertFalse(thread.is_alive(), "did not stop after cancel")
+    return elapsed, outcome.get('error')
+
+# Answers like the Google TTS endpoint, slowly, with the chunk's text as its "MP3"
+class SlowTTSHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    delay = 2.0
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        text = self.requested_text()
+        time.sleep(self.delay)
+        self.send_audio(text)
+
+    def requested_text(self):
+        body = self.rfile.read(int(self.headers['Content-Length'])).decode('utf-8')
+        request = json.loads(urllib.parse.unquote(body[len('f.req='):].rstrip('&')))
+        return json.loads(request[0][0][1])[0]
+
+    def send_audio(self, text):
+        audio = base64.b64encode(f"<{text}>".encode('utf-8')).decode('ascii')
+        data = (')]}\'\n\n123\n[["wrb.fr","jQ1olc","[\\"' + audio + '\\"]",null,null,null,"generic"]]\n').encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+class OfflineCancelTest(unittest.TestCase):
+    def setUp(self):
+        try:
+            from synthesis_worker import SynthesisJob, SynthesisWorker
+        except ImportError as e:
+            self.skipTest(f"PyQt6 is not available: {e}")
+        from progress_channel import ProgressTracker
+        self.worker = SynthesisWorker(None, sink=NullSink(realtime=True))
+        # Each sentence takes about 0.2s to synthesize and 4.5s to play
+        self.worker.engine = create_engine('stub', real_time_factor=0.05, load_seconds=0)
+        self.job = SynthesisJob(1, SynthesisJob.PLAY, 'stub', TEXT, incremental=False)
+        self.progress = ProgressTracker(self.worker.progress_channel, self.job.job_id)
+
+    # Both synthesis of later sentences and playback of the first are running
+    def test_cancel_while_playing(self):
+        elapsed, error = cancel_after(self, lambda: self.worker.streamJob(self.job, self.progress),
+                                      self.job.cancel, 0.5)
+        self.assertIsInstance(error, SynthesisCanceled)
+        self.assertLess(elapsed, CANCEL_BOUND)
+
+class OnlineCancelTest(unittest.TestCase):
+    def setUp(self):
+        try:
+            from chunked_tts import ChunkedSynthesizer, GTTSClient
+        except ImportError as e:
+            self.skipTest(f"gTTS or requests is not available: {e}")
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), SlowTTSHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        endpoint = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        # No cache and no fallback voice, so every chunk has to come from the server
+        synthesizer = ChunkedSynthesizer(GTTSClient(endpoint), workers=2)
+        self.engine = create_engine('gtts', synthesizer=synthesizer)
+        self.cancel_event = threading.Event()
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.engine.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.directory.cleanup()
+
+    # Every request is still waiting for its answer when cancel comes
+    def test_cancel_save_with_requests_in_flight(self):
+        path = os.path.join(self.directory.name, 'story.mp3')
+        elapsed, error = cancel_after(self, lambda: self.engine.save(TEXT, path, 0, self.cancel_event),
+                                      self.cancel_event.set, 0.3)
+        self.assertIsInstance(error, SynthesisCanceled)
+        self.assertLess(elapsed, CANCEL_BOUND)
+        self.assertFalse(os.path.exists(path))
+
+    def test_cancel_stream_with_requests_in_flight(self):
+        elapsed, error = cancel_after(self, lambda: list(self.engine.stream_encoded(TEXT, 0, self.cancel_event)),
+                                      self.cancel_event.set, 0.3)
+        self.assertIsInstance(error, SynthesisCanceled)
+        self.assertLess(elapsed, CANCEL_BOUND)
+
+if __name__ == '__main__':
+    unittest.main()
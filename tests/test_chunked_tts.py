@@ -0,0 +1,92 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, 'shared')]
+
+from test_cancel import TEXT, SlowTTSHandler
+
+# The stand-in endpoint without the delay; the first fail_times requests
+# for the chunk fail_on are answered with a 503
+class FlakyTTSHandler(SlowTTSHandler):
+    fail_on = None
+    fail_times = 1
+    lock = threading.Lock()
+    requests = {}
+
+    def do_POST(self):
+        text = self.requested_text()
+        with self.lock:
+            attempt = self.requests[text] = self.requests.get(text, 0) + 1
+        if text == self.fail_on and attempt <= self.fail_times:
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_audio(text)
+
+class ChunkedSynthesizerTest(unittest.TestCase):
+    def setUp(self):
+        try:
+            from chunked_tts import ChunkFailedError, ChunkedSynthesizer, GTTSClient, split_chunks
+        except ImportError as e:
+            self.skipTest(f"gTTS or requests is not available: {e}")
+        FlakyTTSHandler.fail_on = None
+        FlakyTTSHandler.fail_times = 1
+        FlakyTTSHandler.requests = {}
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyTTSHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        endpoint = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        self.client = GTTSClient(endpoint)
+        self.synthesizer = ChunkedSynthesizer(self.client, workers=4, retries=3, backoff=0.01)
+        self.chunks = split_chunks(TEXT)
+        self.chunk_failed = ChunkFailedError
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.directory.cleanup()
+
+    def test_chunks_end_at_sentence_boundaries(self):
+        self.assertGreater(len(self.chunks), 1)
+        for chunk in self.chunks:
+            self.assertLessEqual(len(chunk), 100)
+            self.assertTrue(chunk.endswith('.'), chunk)
+        self.assertEqual(' '.join(self.chunks), TEXT)
+
+    # One chunk fails once; it alone is fetched again and the file still
+    # has every chunk, in text order
+    def test_failed_chunk_is_retried_and_output_stays_in_order(self):
+        FlakyTTSHandler.fail_on = self.chunks[2]
+        path = os.path.join(self.directory.name, 'story.mp3')
+        self.synthesizer.synthesize_to_file(TEXT, path)
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), b''.join(f"<{chunk}>".encode('utf-8') for chunk in self.chunks))
+        self.assertEqual(FlakyTTSHandler.requests[self.chunks[2]], 2)
+        self.assertTrue(all(FlakyTTSHandler.requests[chunk] == 1 for chunk in self.chunks if chunk != self.chunks[2]))
+        stats = self.client.stats()
+        self.assertEqual(stats['failures'], 1)
+        self.assertEqual(stats['requests'], len(self.chunks) + 1)
+
+    # A chunk that fails on every retry fails the conversion with its index,
+    # and no partial file is left behind
+    def test_chunk_failing_every_retry(self):
+        FlakyTTSHandler.fail_on = self.chunks[2]
+        FlakyTTSHandler.fail_times = 3
+        path = os.path.join(self.directory.name, 'story.mp3')
+        with self.assertRaises(self.chunk_failed) as raised:
+            self.synthesizer.synthesize_to_file(TEXT, path)
+        self.assertEqual(raised.exception.index, 2)
+        self.assertEqual(FlakyTTSHandler.requests[self.chunks[2]], 3)
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(os.path.exists(path + '.part'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import hashlib
+import io
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import zipfile
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, 'shared'), os.path.join(ROOT, 'offline')]
+
+from download_engine import DownloadCanceled, DownloadEngine, DownloadError, RateLimiter
+
+def model_archive():
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, 'w') as archive:
+        archive.writestr('model/model_file.pth', os.urandom(256 * 1024))
+        archive.writestr('model/config.json', '{"model": "vits"}')
+    return output.getvalue()
+
+# Serves one file and honours Range requests like the model hosts do.
+# Records the ranges asked for so a test can tell a resume from a restart.
+class RangeHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    data = b''
+    ranges = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        start, end = 0, len(self.data) - 1
+        match = re.match(r'bytes=(\d+)-(\d*)', self.headers.get('Range', ''))
+        if match:
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else end
+            self.ranges.append((start, end))
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes {start}-{end}/{len(self.data)}")
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', str(end - start + 1))
+        self.end_headers()
+        try:
+            self.wfile.write(self.data[start:end + 1])
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+class DownloadTest(unittest.TestCase):
+    def setUp(self):
+        RangeHandler.data = model_archive()
+        RangeHandler.ranges = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), RangeHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/model.zip"
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'model.zip')
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.directory.cleanup()
+
+    # Cancels once part of the file is on disk, then downloads again: only
+    # the missing ranges are requested and the result matches its hash
+    def test_resume_after_cancel(self):
+        expected_hash = hashlib.sha256(RangeHandler.data).hexdigest()
+        engine = None
+
+        def cancel_halfway(done, total):
+            if done >= total // 3:
+                engine.cancel()
+
+        # Throttled so cancel lands while the segments are still running
+        engine = DownloadEngine(self.url, self.path, connections=2, expected_hash=expected_hash, block_size=4096,
+                                progress_callback=cancel_halfway, rate_limiter=RateLimiter(512 * 1024))
+        with self.assertRaises(DownloadCanceled):
+            engine.run()
+        self.assertFalse(os.path.exists(self.path))
+        self.assertTrue(os.path.exists(self.path + '.part.json'))
+        first_run_bytes = engine.downloaded
+        self.assertGreater(first_run_bytes, 0)
+
+        RangeHandler.ranges = []
+        engine = DownloadEngine(self.url, self.path, connections=2, expected_hash=expected_hash)
+        engine.run()
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read(), RangeHandler.data)
+        self.assertFalse(os.path.exists(self.path + '.part.json'))
+        # The probe asks for byte 0; every other request starts past what was kept
+        resumed = sum(end - start + 1 for start, end in RangeHandler.ranges if (start, end) != (0, 0))
+        self.assertEqual(resumed, len(RangeHandler.data) - first_run_bytes)
+
+    def test_hash_mismatch(self):
+        engine = DownloadEngine(self.url, self.path, expected_hash=hashlib.sha256(b'other').hexdigest())
+        with self.assertRaises(DownloadError):
+            engine.run()
+        self.assertFalse(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(self.path + '.part'))
+
+    # The app's downloader checks the archive against the catalog's MD5
+    def test_model_downloader_checks_catalog_md5(self):
+        try:
+            from model_downloader import ModelDownloader
+        except ImportError as e:
+            self.skipTest(f"PyQt6 is not available: {e}")
+        downloader = ModelDownloader('tts_models/en/test/vits', os.path.join(self.directory.name, 'downloads'))
+        output_path = os.path.join(self.directory.name, 'models', 'tts_models--en--test--vits')
+        with self.assertRaises(DownloadError):
+            downloader.fetchModel('tts_models/en/test/vits', [self.url], output_path,
+                                  hashlib.md5(b'other').hexdigest(), 0, 1)
+        self.assertFalse(os.path.exists(output_path))
+
+        md5sum = hashlib.md5(RangeHandler.data).hexdigest()
+        downloader.fetchModel('tts_models/en/test/vits', [self.url], output_path, md5sum, 0, 1)
+        self.assertEqual(sorted(os.listdir(output_path)), ['config.json', 'hash.md5', 'model_file.pth'])
+
+    # The catalog lookup can't be interrupted; cancel must not wait for it,
+    # or closing the app hangs
+    def test_cancel_during_catalog_lookup(self):
+        try:
+            import model_downloader
+            from PyQt6.QtCore import Qt
+        except ImportError as e:
+            self.skipTest(f"PyQt6 is not available: {e}")
+        lookup_released = threading.Event()
+        self.addCleanup(lookup_released.set)
+        downloader = model_downloader.ModelDownloader('tts_models/en/test/vits', self.directory.name)
+        results = []
+        downloader.completed.connect(lambda success, message: results.append((success, message)),
+                                     Qt.ConnectionType.DirectConnection)
+        with mock.patch.object(model_downloader, 'resolve_downloads', lambda name: lookup_released.wait(10)):
+            thread = threading.Thread(target=downloader.run, daemon=True)
+            thread.start()
+            time.sleep(0.2)
+            canceled_at = time.perf_counter()
+            downloader.cancel()
+            thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertLess(time.perf_counter() - canceled_at, 0.5)
+        self.assertEqual(results, [(False, "Download canceled")])
+
+if __name__ == '__main__':
+    unittest.main()